@@ -1,24 +1,32 @@
-from flask import Flask, redirect
-from flasgger import Swagger
+from flask import Flask, redirect, request
 from flask_cors import CORS
+from src.Monitoring import init_metrics
 
 def create_app() -> Flask:
     app = Flask(__name__)
     CORS(app)
+    metrics = init_metrics(app, tenant_getter=lambda: request.args.get("db_name"))
+
+    from src.LLM.analysis_cache import analysis_cache
+    metrics.register(*analysis_cache.metrics())
 
     from .routes.data_routes import data_bp
     from .routes.user_routes import user_bp
     from .routes.doc_routes import docs_bp
+    from .routes.batch_routes import batch_bp
+    from .routes.dashboard_routes import dashboard_bp
     app.register_blueprint(data_bp, url_prefix="/api/data")
     app.register_blueprint(user_bp, url_prefix="/api/users")
     app.register_blueprint(docs_bp, url_prefix="/api/docs")
+    app.register_blueprint(batch_bp, url_prefix="/api/batch")
+    app.register_blueprint(dashboard_bp, url_prefix="/api/dashboard")
 
-    app.config["SWAGGER"] = {"title": "Financial API", "uiversion": 3}
-    Swagger(app)
+    from .apidocs import init_apidocs
+    apidocs = init_apidocs(app)
 
     @app.get("/")
     def home():
-        return redirect("/apidocs")
+        return redirect("/apidocs" if apidocs else "/health")
 
     @app.get("/health")
     def health():
@@ -0,0 +1,66 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import click
+from flask import Flask
+from flasgger import Swagger
+
+# Set APIDOCS_ENABLED=0 in production to skip Swagger entirely.
+APIDOCS_ENABLED = os.getenv("APIDOCS_ENABLED", "1") != "0"
+# Optional spec prebuilt with `flask build-apidocs`; served as-is when present.
+APIDOCS_CACHE = os.getenv("APIDOCS_CACHE", "")
+
+SPEC_ENDPOINT = "apispec_1"
+
+
+class CachedSwagger(Swagger):
+    """Swagger that builds each spec once, even when the app runs in debug mode.
+
+    Flasgger re-parses every view's YAML docstring on each /apispec_1.json hit
+    in debug mode; here the first request builds the spec and later requests
+    reuse it.
+    """
+
+    def get_apispecs(self, endpoint=SPEC_ENDPOINT):
+        if endpoint not in self.apispecs:
+            super().get_apispecs(endpoint)
+        return self.apispecs[endpoint]
+
+
+def _load_cached_spec(path: str) -> Optional[dict]:
+    if not path or not Path(path).is_file():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return None
+
+
+def init_apidocs(app: Flask) -> Optional[CachedSwagger]:
+    """Attach the Swagger UI at /apidocs, unless disabled by APIDOCS_ENABLED."""
+    if not APIDOCS_ENABLED:
+        return None
+
+    app.config["SWAGGER"] = {"title": "Financial API", "uiversion": 3}
+    swagger = CachedSwagger(app)
+    cached = _load_cached_spec(APIDOCS_CACHE)
+    if cached is not None:
+        swagger.apispecs[SPEC_ENDPOINT] = cached
+
+    @app.cli.command("build-apidocs")
+    @click.argument("path", required=False)
+    def build_apidocs(path):
+        """Write the OpenAPI spec to PATH (defaults to $APIDOCS_CACHE)."""
+        path = path or APIDOCS_CACHE
+        if not path:
+            raise click.UsageError("Pass a path or set APIDOCS_CACHE")
+        swagger.apispecs.pop(SPEC_ENDPOINT, None)
+        spec = swagger.get_apispecs(SPEC_ENDPOINT)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(spec, f, indent=2, default=str)
+        click.echo(f"Wrote API spec to {path}")
+
+    return swagger
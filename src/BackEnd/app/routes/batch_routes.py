@@ -0,0 +1,135 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from flask import Blueprint, jsonify, request
+from src.DataStorage.services import (
+    list_documents,
+    list_all_data,
+    find_user_by_username,
+    summarize_documents,
+    get_dashboard_snapshot
+)
+from ..helpers import to_json
+
+batch_bp = Blueprint("batch", __name__)
+
+MAX_BATCH_SIZE = 20
+
+# Shared across requests so a batch never pays thread start-up.
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="batch")
+
+
+def _docs_list(params: dict):
+    return list_documents(
+        category=params.get("category"),
+        user_id=params.get("user_id"),
+        db_name=params.get("db_name")
+    )
+
+
+def _data_list(params: dict):
+    return [to_json(d) for d in list_all_data(db_name=params.get("db_name"))]
+
+
+def _user_profile(params: dict):
+    user = find_user_by_username(params.get("username"))
+    if not user:
+        raise LookupError("User not found")
+    user["_id"] = str(user["_id"])
+    user.pop("password", None)
+    return user
+
+
+def _docs_summary(params: dict):
+    return summarize_documents(db_name=params.get("db_name"))
+
+
+def _dashboard_snapshot(params: dict):
+    return get_dashboard_snapshot(db_name=params.get("db_name"))
+
+
+BATCH_OPS = {
+    "docs.list": _docs_list,
+    "data.list": _data_list,
+    "users.profile": _user_profile,
+    "docs.summary": _docs_summary,
+    "dashboard.snapshot": _dashboard_snapshot,
+}
+
+
+def _run(op: str, params: Optional[dict]) -> dict:
+    handler = BATCH_OPS.get(op)
+    if handler is None:
+        return {"op": op, "status": 400, "error": f"Unknown op: {op}"}
+    if params is None:
+        return {"op": op, "status": 400, "error": "params must be an object"}
+    try:
+        return {"op": op, "status": 200, "body": handler(params)}
+    except LookupError as e:
+        return {"op": op, "status": 404, "error": str(e)}
+    except Exception as e:
+        return {"op": op, "status": 500, "error": str(e)}
+
+
+@batch_bp.post("/")
+def run_batch():
+    """Run several read operations in one round trip
+    ---
+    tags: [Batch]
+    parameters:
+      - name: db_name
+        in: query
+        description: Default database name for every sub-request
+        required: false
+        schema:
+          type: string
+    requestBody:
+      required: true
+      content:
+        application/json:
+          schema:
+            type: object
+            properties:
+              requests:
+                type: array
+                items:
+                  type: object
+                  properties:
+                    op:
+                      type: string
+                      enum: [docs.list, data.list, users.profile, docs.summary, dashboard.snapshot]
+                    params:
+                      type: object
+            required: [requests]
+            example:
+              requests:
+                - { op: "docs.list", params: { category: "Taxes > VAT KOR" } }
+                - { op: "users.profile", params: { username: "ted" } }
+    responses:
+      200:
+        description: One result per sub-request, in request order
+      400:
+        description: Missing or oversized request list
+    """
+    data = request.get_json(silent=True) or {}
+    sub_requests = data.get("requests")
+    if not isinstance(sub_requests, list) or not sub_requests:
+        return jsonify({"error": "requests must be a non-empty list"}), 400
+    if len(sub_requests) > MAX_BATCH_SIZE:
+        return jsonify({"error": f"At most {MAX_BATCH_SIZE} requests per batch"}), 400
+
+    db_name = request.args.get("db_name") or data.get("db_name")
+    jobs = []
+    for sub in sub_requests:
+        sub = sub if isinstance(sub, dict) else {}
+        params = sub.get("params") or {}
+        if not isinstance(params, dict):
+            # Reported on this entry only; the rest of the batch still runs
+            jobs.append((sub.get("op"), None))
+            continue
+        params = dict(params)
+        if db_name:
+            params.setdefault("db_name", db_name)
+        jobs.append((sub.get("op"), params))
+
+    futures = [_executor.submit(_run, op, params) for op, params in jobs]
+    return jsonify({"results": [f.result() for f in futures]}), 200
@@ -0,0 +1,72 @@
+from flask import Blueprint, jsonify, request
+from datetime import datetime
+from src.DataStorage.services import get_dashboard_snapshot
+
+dashboard_bp = Blueprint("dashboard", __name__)
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+@dashboard_bp.get("/")
+def dashboard_snapshot():
+    """Dashboard snapshot for the index page
+    ---
+    tags: [Dashboard]
+    parameters:
+      - name: db_name
+        in: query
+        description: Database name
+        required: false
+        schema:
+          type: string
+      - name: limit
+        in: query
+        description: Number of upcoming approvals to return (default 5)
+        required: false
+        schema:
+          type: integer
+      - name: days
+        in: query
+        description: Only approvals due within this many days (default 60)
+        required: false
+        schema:
+          type: integer
+      - name: calendar_start
+        in: query
+        description: First calendar day, YYYY-MM-DD (default first day of this month)
+        required: false
+        schema:
+          type: string
+      - name: calendar_end
+        in: query
+        description: Last calendar day, YYYY-MM-DD (default end of calendar_start's month)
+        required: false
+        schema:
+          type: string
+    responses:
+      200:
+        description: Upcoming approvals and deadlines bucketed by calendar day
+      400:
+        description: Invalid number or date
+    """
+    db_name = request.args.get("db_name")
+    try:
+        limit = int(request.args.get("limit") or 5)
+        days = int(request.args.get("days") or 60)
+        calendar_start = _parse_date(request.args.get("calendar_start"))
+        calendar_end = _parse_date(request.args.get("calendar_end"))
+    except ValueError:
+        return jsonify({"error": "limit/days must be integers and dates YYYY-MM-DD"}), 400
+
+    snapshot = get_dashboard_snapshot(
+        db_name=db_name,
+        limit=limit,
+        window_days=days,
+        calendar_start=calendar_start,
+        calendar_end=calendar_end
+    )
+    return jsonify(snapshot), 200
@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, request
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
 from bson import ObjectId
 from datetime import datetime
 from src.DataStorage.services import (
@@ -6,8 +7,11 @@ from src.DataStorage.services import (
     find_document_by_id,
     create_document,
     update_document,
-    delete_document
+    delete_document,
+    summarize_documents,
+    list_document_changes
 )
+from ..uploads import save_multipart_stream, enqueue_analysis, get_job
 
 docs_bp = Blueprint("docs", __name__, url_prefix="/api/docs")
 
@@ -30,6 +34,18 @@ def list_docs():
         required: false
         schema:
           type: string
+      - name: limit
+        in: query
+        description: Page size; when given, documents are returned newest first
+        required: false
+        schema:
+          type: integer
+      - name: offset
+        in: query
+        description: Number of documents to skip (with limit)
+        required: false
+        schema:
+          type: integer
     responses:
       200:
         description: Returns a list of documents
@@ -37,10 +53,65 @@ def list_docs():
     category = request.args.get("category")
     user_id = request.args.get("user_id")
     db_name = request.args.get("db_name")
+    limit = request.args.get("limit", type=int)
+    offset = request.args.get("offset", 0, type=int)
+    if (limit is not None and limit < 0) or offset < 0:
+        return jsonify({"error": "limit and offset must be non-negative"}), 400
     
-    docs = list_documents(category=category, user_id=user_id, db_name=db_name)
+    docs = list_documents(category=category, user_id=user_id, db_name=db_name, limit=limit, offset=offset)
     return jsonify(docs), 200
 
+@docs_bp.get("/summary")
+def docs_summary():
+    """Count documents per category
+    ---
+    tags: [Documents]
+    parameters:
+      - name: db_name
+        in: query
+        description: Database name
+        required: false
+        schema:
+          type: string
+    responses:
+      200:
+        description: Total and per-category document counts
+    """
+    db_name = request.args.get("db_name")
+    return jsonify(summarize_documents(db_name=db_name)), 200
+
+@docs_bp.get("/changes")
+def docs_changes():
+    """List documents changed since a change token
+    ---
+    tags: [Documents]
+    parameters:
+      - name: since
+        in: query
+        description: Cursor from the previous call; omit or 0 for a full snapshot
+        required: false
+        schema:
+          type: integer
+      - name: db_name
+        in: query
+        description: Database name
+        required: false
+        schema:
+          type: string
+    responses:
+      200:
+        description: Changed documents, deleted ids and the next cursor
+      400:
+        description: Invalid since token
+    """
+    db_name = request.args.get("db_name")
+    try:
+        since = int(request.args.get("since") or 0)
+    except ValueError:
+        return jsonify(success=False, message="since must be an integer"), 400
+
+    return jsonify(list_document_changes(since=since, db_name=db_name)), 200
+
 @docs_bp.post("/")
 def add_doc():
     """Add a new document
@@ -106,6 +177,106 @@ def add_doc():
     return jsonify(success=True, message="Document added successfully", id=doc_id), 201
 
 
+@docs_bp.post("/upload")
+def upload_doc():
+    """Upload a document and queue it for analysis
+    ---
+    tags: [Documents]
+    parameters:
+      - name: db_name
+        in: query
+        description: Database the analyzed document is saved to
+        required: false
+        schema:
+          type: string
+    requestBody:
+      required: true
+      content:
+        multipart/form-data:
+          schema:
+            type: object
+            properties:
+              file:
+                type: string
+                format: binary
+            required: [file]
+    responses:
+      202:
+        description: File stored; returns the analysis job to poll
+      400:
+        description: Not a multipart body, a truncated or malformed body, or no file part
+      413:
+        description: File exceeds MAX_UPLOAD_BYTES
+    """
+    boundary = request.mimetype_params.get("boundary")
+    if request.mimetype != "multipart/form-data" or not boundary:
+        return jsonify(success=False, message="Expected multipart/form-data with a 'file' part"), 400
+
+    try:
+        upload = save_multipart_stream(request.stream, boundary)
+    except RequestEntityTooLarge:
+        return jsonify(success=False, message="File exceeds the upload size limit"), 413
+    except BadRequest as e:
+        return jsonify(success=False, message=e.description), 400
+    db_name = request.args.get("db_name") or upload["fields"].get("db_name")
+    job = enqueue_analysis(upload, db_name=db_name)
+    return jsonify(success=True, **job), 202
+
+
+@docs_bp.get("/upload/<job_id>")
+def upload_status(job_id):
+    """Get the status of an upload analysis job
+    ---
+    tags: [Documents]
+    parameters:
+      - name: job_id
+        in: path
+        required: true
+        schema:
+          type: string
+    responses:
+      200:
+        description: Job status (queued, running, done or failed) and result
+      404:
+        description: Unknown job id
+    """
+    job = get_job(job_id)
+    if not job:
+        return jsonify(success=False, message="Job not found"), 404
+    return jsonify(success=True, **job), 200
+
+
+@docs_bp.get("/<doc_id>")
+def get_doc(doc_id):
+    """Get a single document by ID
+    ---
+    tags: [Documents]
+    parameters:
+      - name: doc_id
+        in: path
+        required: true
+        schema:
+          type: string
+      - name: db_name
+        in: query
+        description: Database name
+        required: false
+        schema:
+          type: string
+    responses:
+      200:
+        description: The document
+      404:
+        description: Document not found
+    """
+    db_name = request.args.get("db_name")
+    
+    doc = find_document_by_id(doc_id, db_name=db_name)
+    if not doc:
+        return jsonify(success=False, message="Document not found"), 404
+
+    return jsonify(doc), 200
+
 @docs_bp.put("/<doc_id>")
 def update_doc(doc_id):
     """Update a document by ID
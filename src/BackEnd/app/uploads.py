@@ -0,0 +1,217 @@
+import hashlib
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, IO, Optional
+
+from pymongo.errors import DuplicateKeyError
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+from werkzeug.utils import secure_filename
+
+from src.DataStorage.db import get_db
+
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR", Path(__file__).resolve().parent.parent / "uploads"))
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "1"))
+# A queued or running job not updated for this long is assumed lost (e.g. the
+# process restarted) and an identical upload is analyzed again
+ANALYSIS_JOB_TIMEOUT = int(os.getenv("ANALYSIS_JOB_TIMEOUT", "3600"))
+
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+def _jobs_collection():
+    """Upload jobs of every tenant, in the default database so any worker can report them."""
+    global _indexes_ready
+    collection = get_db()["upload_jobs"]
+    if not _indexes_ready:
+        with _indexes_lock:
+            if not _indexes_ready:
+                # At most one live (queued, running or done) job per file and tenant
+                collection.create_index(
+                    [("db_name", 1), ("sha256", 1), ("live", 1)],
+                    unique=True,
+                    partialFilterExpression={"live": True}
+                )
+                _indexes_ready = True
+    return collection
+
+
+def save_multipart_stream(stream: IO[bytes], boundary: str, field_name: str = "file") -> Dict:
+    """
+    Stream a multipart body to UPLOAD_DIR without buffering the file in memory.
+    Returns {"path", "filename", "sha256", "size_bytes", "fields"} for the
+    first file part named `field_name`.
+    """
+    UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+    decoder = MultipartDecoder(boundary.encode("latin-1"), max_form_memory_size=64 * 1024)
+    hasher = hashlib.sha256()
+    fields: Dict[str, str] = {}
+    field_buffer = bytearray()
+    current_field: Optional[str] = None
+    out: Optional[IO[bytes]] = None
+    tmp_path: Optional[Path] = None
+    filename = None
+    size = 0
+    in_file = False
+    done = False
+
+    try:
+        while not done:
+            chunk = stream.read(CHUNK_SIZE)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, NeedData):
+                if isinstance(event, Epilogue):
+                    done = True
+                    break
+                if isinstance(event, File):
+                    in_file = event.name == field_name and out is None and tmp_path is None
+                    if in_file:
+                        filename = secure_filename(event.filename or "") or "upload.bin"
+                        tmp_path = UPLOAD_DIR / f".{uuid.uuid4().hex}.part"
+                        out = open(tmp_path, "wb")
+                elif isinstance(event, Field):
+                    in_file = False
+                    current_field = event.name
+                    field_buffer.clear()
+                elif isinstance(event, Data):
+                    if in_file:
+                        size += len(event.data)
+                        if size > MAX_UPLOAD_BYTES:
+                            raise RequestEntityTooLarge()
+                        hasher.update(event.data)
+                        out.write(event.data)
+                        if not event.more_data:
+                            out.close()
+                            in_file = False
+                    elif current_field is not None:
+                        field_buffer.extend(event.data)
+                        if not event.more_data:
+                            fields[current_field] = field_buffer.decode("utf-8", "replace")
+                            current_field = None
+                event = decoder.next_event()
+            if not chunk:
+                break
+        if not done:
+            raise BadRequest("Truncated multipart body")
+        if tmp_path is None:
+            raise BadRequest(f"Missing file part '{field_name}'")
+    except Exception as e:
+        if out is not None:
+            out.close()
+        if tmp_path is not None:
+            tmp_path.unlink(missing_ok=True)
+        if isinstance(e, ValueError):
+            # MultipartDecoder rejects malformed bodies with ValueError
+            raise BadRequest(f"Malformed multipart body: {e}")
+        raise
+
+    if not out.closed:
+        out.close()
+
+    digest = hasher.hexdigest()
+    # Unique per upload: an identical file may still be read by a running analysis
+    final_path = UPLOAD_DIR / f"{digest[:16]}_{uuid.uuid4().hex[:8]}_{filename}"
+    tmp_path.replace(final_path)
+    return {
+        "path": str(final_path),
+        "filename": filename,
+        "sha256": digest,
+        "size_bytes": size,
+        "fields": fields,
+    }
+
+
+def _update_job(job_id: str, **changes):
+    changes["updated_at"] = datetime.utcnow().isoformat()
+    update = {"$set": changes}
+    if changes.get("status") == "failed":
+        # A failed job no longer claims its file, so the same upload can be retried
+        update["$unset"] = {"live": ""}
+    _jobs_collection().update_one({"_id": job_id}, update)
+
+
+def _analyze(job_id: str, upload: Dict, db_name: Optional[str]):
+    _update_job(job_id, status="running")
+    try:
+        from src.LLM.llm_functions import document_analyzer, parse_json_reply
+        from src.DataStorage.services import create_document
+
+        raw = document_analyzer(upload["path"])
+        analysis = parse_json_reply(raw)
+        doc_id = None
+        if analysis:
+            analysis.setdefault("deadlines", [])
+            analysis.update({
+                "source": "upload",
+                "file_name": upload["filename"],
+                "sha256": upload["sha256"],
+            })
+            doc_id = create_document(analysis, db_name=db_name)
+        _update_job(job_id, status="done", analysis=analysis or raw, doc_id=doc_id)
+    except Exception as e:
+        _update_job(job_id, status="failed", error=str(e))
+
+
+def _public(job: Dict) -> Dict:
+    """The job as returned to clients: without the stored file's server path."""
+    return {k: v for k, v in job.items() if k not in ("_id", "file", "live")}
+
+
+def enqueue_analysis(upload: Dict, db_name: Optional[str] = None) -> Dict:
+    """
+    Queue an uploaded file for document_analyzer and return its job.
+    A file whose content hash is already queued or analyzed for the same
+    database reuses the existing job instead of being analyzed again.
+    """
+    job_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    job = {
+        "_id": job_id,
+        "job_id": job_id,
+        "status": "queued",
+        "live": True,
+        "file": upload["path"],
+        "file_name": upload["filename"],
+        "sha256": upload["sha256"],
+        "size_bytes": upload["size_bytes"],
+        "db_name": db_name,
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+    }
+    jobs = _jobs_collection()
+    same_file = {"db_name": db_name, "sha256": upload["sha256"], "live": True}
+    # Jobs lost with their process stop blocking the file
+    stale = (now - timedelta(seconds=ANALYSIS_JOB_TIMEOUT)).isoformat()
+    jobs.update_many(
+        dict(same_file, status={"$in": ["queued", "running"]}, updated_at={"$lt": stale}),
+        {"$set": {"status": "failed", "error": "Analysis did not finish"}, "$unset": {"live": ""}}
+    )
+    while True:
+        try:
+            # The unique index on live jobs admits one of several concurrent identical uploads
+            jobs.insert_one(job)
+            break
+        except DuplicateKeyError:
+            existing = jobs.find_one(same_file)
+            if existing is None:
+                # The live job failed in between; try to take its place
+                continue
+            Path(upload["path"]).unlink(missing_ok=True)
+            return dict(_public(existing), duplicate=True)
+
+    _executor.submit(_analyze, job_id, upload, db_name)
+    return _public(job)
+
+
+def get_job(job_id: str) -> Optional[Dict]:
+    job = _jobs_collection().find_one({"_id": job_id})
+    return _public(job) if job else None
@@ -24,7 +24,10 @@ from .services import (
     find_document_by_id,
     create_document,
     update_document,
-    delete_document
+    delete_document,
+    summarize_documents,
+    list_document_changes,
+    get_dashboard_snapshot
 )
 
 __all__ = [
@@ -44,6 +47,9 @@ __all__ = [
     'find_document_by_id',
     'create_document',
     'update_document',
-    'delete_document'
+    'delete_document',
+    'summarize_documents',
+    'list_document_changes',
+    'get_dashboard_snapshot'
 ]
 
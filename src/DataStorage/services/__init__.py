@@ -19,7 +19,13 @@ from .document_service import (
     find_document_by_id,
     create_document,
     update_document,
-    delete_document
+    delete_document,
+    summarize_documents,
+    list_document_changes
+)
+
+from .dashboard_service import (
+    get_dashboard_snapshot
 )
 
 __all__ = [
@@ -37,6 +43,9 @@ __all__ = [
     'find_document_by_id',
     'create_document',
     'update_document',
-    'delete_document'
+    'delete_document',
+    'summarize_documents',
+    'list_document_changes',
+    'get_dashboard_snapshot'
 ]
 
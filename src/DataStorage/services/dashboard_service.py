@@ -0,0 +1,169 @@
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict
+
+from src.DataStorage.services.document_service import list_document_changes
+
+
+def _deadline_items(doc: dict) -> List[tuple]:
+    """Return (date, item) pairs for every parseable deadline of a document."""
+    items = []
+    doc_id = str(doc.get("_id"))
+    for deadline in doc.get("deadlines") or []:
+        if isinstance(deadline, dict):
+            deadline_date = deadline.get("date")
+            deadline_desc = deadline.get("description", "Pending review")
+        elif isinstance(deadline, list) and len(deadline) >= 2:
+            deadline_date = deadline[0]
+            deadline_desc = deadline[1]
+        else:
+            continue
+        if not deadline_date or not isinstance(deadline_date, str):
+            continue
+        try:
+            deadline_date_obj = datetime.strptime(deadline_date[:10], "%Y-%m-%d").date()
+        except ValueError:
+            continue
+        items.append((deadline_date_obj, {
+            "id": doc_id,
+            "doc_id": doc_id,
+            "title": doc.get("name", "Document"),
+            "description": deadline_desc,
+            "deadline_date": deadline_date,
+            "deadline_display": deadline_date_obj.strftime("%d-%m-%Y"),
+            "category": doc.get("category", ""),
+        }))
+    return items
+
+
+def _month_end(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+
+
+def _sort_key(entry: tuple) -> tuple:
+    return entry[:3]
+
+
+def _entry_date(entry: tuple) -> date:
+    return entry[0]
+
+
+class DeadlineIndex:
+    """
+    Deadlines of one tenant kept sorted by date, updated from the document
+    change feed so each refresh only touches documents that changed. The
+    feed's cursor never passes a write still in flight and its queries use
+    the _seq index, so refreshes neither miss documents nor scan the
+    collection.
+    """
+
+    def __init__(self, db_name: Optional[str] = None):
+        self.db_name = db_name
+        self.cursor = 0
+        self._entries: List[tuple] = []  # (date, doc_id, n, item), sorted
+        self._by_doc: Dict[str, List[tuple]] = {}
+        self.lock = threading.Lock()
+
+    def _remove_doc(self, doc_id: str):
+        for entry in self._by_doc.pop(doc_id, []):
+            i = bisect_left(self._entries, entry[:3], key=_sort_key)
+            if i < len(self._entries) and self._entries[i][:3] == entry[:3]:
+                del self._entries[i]
+
+    def _add_doc(self, doc: dict):
+        doc_id = str(doc.get("_id"))
+        entries = []
+        for n, (deadline_date, item) in enumerate(_deadline_items(doc)):
+            entry = (deadline_date, doc_id, n, item)
+            insort(self._entries, entry, key=_sort_key)
+            entries.append(entry)
+        if entries:
+            self._by_doc[doc_id] = entries
+
+    def refresh(self):
+        """Apply document changes made since the last refresh."""
+        changes = list_document_changes(since=self.cursor, db_name=self.db_name)
+        if changes["full"]:
+            # First load, or the cursor is older than the kept tombstones:
+            # rebuild aside and swap, so a failed rebuild keeps the old index
+            rebuilt = DeadlineIndex(self.db_name)
+            for doc in changes["changed"]:
+                rebuilt._add_doc(doc)
+            self._entries, self._by_doc = rebuilt._entries, rebuilt._by_doc
+            self.cursor = changes["cursor"]
+            return
+        for doc_id in changes["deleted"]:
+            self._remove_doc(doc_id)
+        for doc in changes["changed"]:
+            doc_id = str(doc.get("_id"))
+            self._remove_doc(doc_id)
+            self._add_doc(doc)
+        self.cursor = changes["cursor"]
+
+    def between(self, start: date, end: date, today: Optional[date] = None) -> List[Dict]:
+        """Deadlines with start <= date <= end, in date order."""
+        today = today or datetime.now().date()
+        lo = bisect_left(self._entries, start, key=_entry_date)
+        hi = bisect_right(self._entries, end, key=_entry_date)
+        return [
+            dict(item, is_completed=deadline_date < today)
+            for deadline_date, _, _, item in self._entries[lo:hi]
+        ]
+
+
+_indexes: Dict[Optional[str], DeadlineIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def _index_for(db_name: Optional[str]) -> DeadlineIndex:
+    with _indexes_lock:
+        index = _indexes.get(db_name)
+        if index is None:
+            index = _indexes[db_name] = DeadlineIndex(db_name)
+        return index
+
+
+def get_dashboard_snapshot(
+    db_name: Optional[str] = None,
+    limit: int = 5,
+    window_days: int = 60,
+    calendar_start: Optional[date] = None,
+    calendar_end: Optional[date] = None
+) -> Dict:
+    """
+    Dashboard data for the index page: the next `limit` deadlines due within
+    `window_days`, and the deadlines between calendar_start and calendar_end
+    bucketed by day.
+    """
+    today = datetime.now().date()
+    calendar_start = calendar_start or today.replace(day=1)
+    calendar_end = calendar_end or _month_end(calendar_start)
+
+    index = _index_for(db_name)
+    with index.lock:
+        index.refresh()
+        approvals = index.between(today, today + timedelta(days=window_days), today=today)[:limit]
+        calendar_items = index.between(calendar_start, calendar_end, today=today)
+        cursor = index.cursor
+
+    calendar = {}
+    for item in calendar_items:
+        calendar.setdefault(item["deadline_date"][:10], []).append(item)
+
+    return {
+        "approvals": approvals,
+        "calendar": {
+            "start": calendar_start.isoformat(),
+            "end": calendar_end.isoformat(),
+            "days": calendar,
+        },
+        "cursor": cursor,
+        "generated_at": datetime.utcnow().isoformat(),
+    }
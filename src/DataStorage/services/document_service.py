@@ -4,27 +4,127 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+import os
+import threading
+import time
+from contextlib import contextmanager
+
 from src.DataStorage.db import get_db
 from bson import ObjectId
-from datetime import datetime
-from typing import Optional, List, Dict
+from pymongo import ReturnDocument
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Tuple
+
+
+# Deleted-document records older than this are pruned; clients whose
+# change token is older get a full snapshot instead of a delta
+TOMBSTONE_RETENTION_DAYS = float(os.getenv("TOMBSTONE_RETENTION_DAYS", "30"))
+# A write still marked in flight after this long is assumed to have died
+IN_FLIGHT_TIMEOUT = 60
+
+_indexed_dbs = set()
+_indexed_lock = threading.Lock()
+
+
+def _ensure_indexes(db):
+    """Index the change sequence once per database, so delta queries don't scan."""
+    if db.name in _indexed_dbs:
+        return
+    with _indexed_lock:
+        if db.name in _indexed_dbs:
+            return
+        db["documents"].create_index("_seq")
+        db["document_tombstones"].create_index("_seq")
+        db["document_tombstones"].create_index("deleted_at")
+        _indexed_dbs.add(db.name)
+
+
+def _get_db(db_name: Optional[str] = None):
+    db = get_db(db_name) if db_name else get_db()
+    _ensure_indexes(db)
+    return db
 
 
 def _documents_collection(db_name: Optional[str] = None):
     """Return Mongo collection for documents in specified database."""
-    db = get_db(db_name) if db_name else get_db()
-    return db["documents"]
+    return _get_db(db_name)["documents"]
+
 
+def _tombstones_collection(db_name: Optional[str] = None):
+    """Return Mongo collection recording deleted document ids."""
+    return _get_db(db_name)["document_tombstones"]
 
-def list_documents(category: Optional[str] = None, user_id: Optional[str] = None, db_name: Optional[str] = None) -> List[Dict]:
-    """List documents, optionally filtered by category and/or user_id."""
+
+@contextmanager
+def _sequenced_write(db_name: Optional[str] = None):
+    """
+    Allocate the next change sequence number for a write done inside the
+    block. The number is registered as in flight in the same atomic update
+    that allocates it and released once the block ends, so readers of the
+    change feed never move their cursor past a write that hasn't landed.
+    """
+    counters = _get_db(db_name)["counters"]
+    token = ObjectId()
+    counter = counters.find_one_and_update(
+        {"_id": "documents"},
+        {"$inc": {"seq": 1}, "$push": {"in_flight": {"token": token, "at": time.time()}}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    seq = counter["seq"]
+    counters.update_one({"_id": "documents", "in_flight.token": token}, {"$set": {"in_flight.$.seq": seq}})
+    try:
+        yield seq
+    finally:
+        counters.update_one({"_id": "documents"}, {"$pull": {"in_flight": {"token": token}}})
+
+
+def _feed_state(db_name: Optional[str] = None) -> Tuple[int, int]:
+    """
+    (stable_seq, pruned_seq). Every write numbered up to stable_seq has
+    landed; tombstones up to pruned_seq have been removed.
+    """
+    counters = _get_db(db_name)["counters"]
+    counter = counters.find_one({"_id": "documents"}) or {}
+    stable = counter.get("seq", 0)
+    cutoff = time.time() - IN_FLIGHT_TIMEOUT
+    in_flight = [w for w in counter.get("in_flight", []) if w.get("at", 0) >= cutoff]
+    if len(in_flight) < len(counter.get("in_flight", [])):
+        counters.update_one({"_id": "documents"}, {"$pull": {"in_flight": {"at": {"$lt": cutoff}}}})
+    for write in in_flight:
+        if "seq" not in write:
+            # Allocated but not yet numbered: it may be anywhere up to seq
+            return 0, counter.get("pruned_seq", 0)
+        stable = min(stable, write["seq"] - 1)
+    return stable, counter.get("pruned_seq", 0)
+
+
+def _prune_tombstones(db_name: Optional[str] = None):
+    cutoff = (datetime.utcnow() - timedelta(days=TOMBSTONE_RETENTION_DAYS)).isoformat()
+    tombstones = _tombstones_collection(db_name)
+    newest = tombstones.find_one({"deleted_at": {"$lt": cutoff}}, sort=[("_seq", -1)])
+    if newest is None:
+        return
+    _get_db(db_name)["counters"].update_one({"_id": "documents"}, {"$max": {"pruned_seq": newest["_seq"]}})
+    tombstones.delete_many({"_seq": {"$lte": newest["_seq"]}})
+
+
+def list_documents(category: Optional[str] = None, user_id: Optional[str] = None, db_name: Optional[str] = None,
+                   limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+    """
+    List documents, optionally filtered by category and/or user_id. With a
+    limit, returns that page of documents, newest first.
+    """
     query = {}
     if category:
         query["category"] = category
     if user_id:
         query["user_id"] = user_id
     
-    docs = list(_documents_collection(db_name).find(query))
+    cursor = _documents_collection(db_name).find(query)
+    if limit is not None:
+        cursor = cursor.sort("_id", -1).skip(offset).limit(limit)
+    docs = list(cursor)
     for doc in docs:
         doc["_id"] = str(doc["_id"])
     return docs
@@ -45,22 +145,32 @@ def create_document(data: dict, db_name: Optional[str] = None) -> str:
     """Create a new document."""
     if "created_at" not in data:
         data["created_at"] = datetime.utcnow().isoformat()
+    data["updated_at"] = datetime.utcnow().isoformat()
     
-    res = _documents_collection(db_name).insert_one(data)
+    with _sequenced_write(db_name) as seq:
+        data["_seq"] = seq
+        res = _documents_collection(db_name).insert_one(data)
     return str(res.inserted_id)
 
 
 def update_document(doc_id: str, updates: dict, db_name: Optional[str] = None) -> bool:
-    """Update a document by ID."""
+    """
+    Update a document by ID. Returns False if it doesn't exist or the
+    updates change nothing; only real changes get a new _seq.
+    """
     try:
         oid = ObjectId(doc_id)
     except Exception:
         return False
+    if not updates:
+        return False
     
-    result = _documents_collection(db_name).update_one(
-        {"_id": oid},
-        {"$set": updates}
-    )
+    with _sequenced_write(db_name) as seq:
+        # Matches only if some field differs, so no-op updates stay "not modified"
+        result = _documents_collection(db_name).update_one(
+            {"_id": oid, "$or": [{field: {"$ne": value}} for field, value in updates.items()]},
+            {"$set": dict(updates, _seq=seq, updated_at=datetime.utcnow().isoformat())}
+        )
     return result.modified_count > 0
 
 
@@ -71,6 +181,52 @@ def delete_document(doc_id: str, db_name: Optional[str] = None) -> bool:
     except Exception:
         return False
     
-    result = _documents_collection(db_name).delete_one({"_id": oid})
-    return result.deleted_count > 0
+    with _sequenced_write(db_name) as seq:
+        result = _documents_collection(db_name).delete_one({"_id": oid})
+        if result.deleted_count == 0:
+            return False
+        _tombstones_collection(db_name).insert_one({
+            "doc_id": doc_id,
+            "_seq": seq,
+            "deleted_at": datetime.utcnow().isoformat()
+        })
+    _prune_tombstones(db_name)
+    return True
+
+
+def list_document_changes(since: int = 0, db_name: Optional[str] = None) -> Dict:
+    """
+    Return documents created, updated or deleted after change token `since`.
+    A token of 0, or one older than the tombstone retention, returns a full
+    snapshot. The returned cursor is the token to pass on the next call; it
+    never moves past a write that is still in flight.
+    """
+    stable, pruned = _feed_state(db_name)
+    if since <= 0 or since < pruned:
+        docs = list_documents(db_name=db_name)
+        return {"cursor": stable, "full": True, "changed": docs, "deleted": []}
+    if stable <= since:
+        return {"cursor": since, "full": False, "changed": [], "deleted": []}
+
+    window = {"_seq": {"$gt": since, "$lte": stable}}
+    changed = list(_documents_collection(db_name).find(window).sort("_seq", 1))
+    for doc in changed:
+        doc["_id"] = str(doc["_id"])
+    tombstones = list(_tombstones_collection(db_name).find(window).sort("_seq", 1))
+    return {
+        "cursor": stable,
+        "full": False,
+        "changed": changed,
+        "deleted": [t["doc_id"] for t in tombstones]
+    }
+
 
+def summarize_documents(db_name: Optional[str] = None) -> Dict:
+    """Count documents per category."""
+    pipeline = [{"$group": {"_id": "$category", "count": {"$sum": 1}}}]
+    by_category = {}
+    total = 0
+    for row in _documents_collection(db_name).aggregate(pipeline):
+        by_category[row["_id"] or "Uncategorized"] = row["count"]
+        total += row["count"]
+    return {"total": total, "by_category": by_category}
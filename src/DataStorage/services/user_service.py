@@ -1,7 +1,7 @@
 import sys
 from pathlib import Path
 
-project_root = Path(_file_).parent.parent.parent.parent
+project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from src.DataStorage.db import get_client, username_to_db_name, get_user_db, get_db
@@ -5,6 +5,21 @@ def create_app():
     app = Flask(__name__)
     app.config['SECRET_KEY'] = 'dev-secret-key-change-in-production'
     
+    from src.FrontEnd.session_store import init_session_store
+    init_session_store(app)
+    
+    from src.Monitoring import init_metrics
+    metrics = init_metrics(app, tenant_getter=lambda: session.get('database_name'))
+    
+    from src.FrontEnd.notifications import broker, init_sse
+    metrics.register(*broker.metrics())
+    init_sse(app, broker)
+    
+    from src.FrontEnd.assets import init_assets
+    from src.FrontEnd.fragments import init_fragments
+    init_assets(app)
+    init_fragments(app)
+    
     from src.FrontEnd.routes import bp as frontend_bp
     app.register_blueprint(frontend_bp)
     
@@ -0,0 +1,106 @@
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+from flask import Flask, url_for
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<hash>[0-9a-f]{12})(?P<ext>\.[^./]+)$")
+
+
+def _fingerprint(filename: str, digest: str) -> str:
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}.{digest[:12]}{ext}"
+
+
+class AssetManifest:
+    """
+    Content hashes of the files under a static folder, built at startup.
+    In debug mode a file is rehashed when its mtime changes, so edits show
+    up without a restart.
+    """
+
+    def __init__(self, static_folder: str, watch: bool = False):
+        self.static_folder = static_folder
+        self.watch = watch
+        self._assets: Dict[str, tuple] = {}  # filename -> (mtime, fingerprinted)
+        self._originals: Dict[str, str] = {}  # fingerprinted -> filename
+        self._lock = threading.Lock()
+        for root, _, files in os.walk(static_folder):
+            for name in files:
+                path = os.path.join(root, name)
+                self._add(os.path.relpath(path, static_folder).replace(os.sep, "/"))
+
+    def _add(self, filename: str) -> Optional[str]:
+        path = os.path.join(self.static_folder, filename)
+        try:
+            mtime = os.path.getmtime(path)
+            with open(path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+        fingerprinted = _fingerprint(filename, digest)
+        with self._lock:
+            self._assets[filename] = (mtime, fingerprinted)
+            self._originals[fingerprinted] = filename
+        return fingerprinted
+
+    def url_name(self, filename: str) -> str:
+        """Fingerprinted name for a static file, or the name itself if unknown."""
+        entry = self._assets.get(filename)
+        if entry is None or (self.watch and self._changed(filename, entry[0])):
+            return self._add(filename) or filename
+        return entry[1]
+
+    def _changed(self, filename: str, mtime: float) -> bool:
+        try:
+            return os.path.getmtime(os.path.join(self.static_folder, filename)) != mtime
+        except OSError:
+            return True
+
+    def resolve(self, requested: str):
+        """
+        Map a requested name to (filename, current). `current` is False for
+        a fingerprint from an older version of the file, which is still
+        served but must not be cached as immutable.
+        """
+        filename = self._originals.get(requested)
+        if filename is not None and self._assets.get(filename, (0, None))[1] == requested:
+            return filename, True
+        match = _FINGERPRINT_RE.match(requested)
+        if match:
+            return match.group("stem") + match.group("ext"), False
+        return requested, False
+
+
+def init_assets(app: Flask) -> AssetManifest:
+    """
+    Hash the app's static files and add an `asset_url(filename)` template
+    helper that links to fingerprinted names, e.g. css/main.3f9c0a1b2c4d.css.
+    Those names are served with an immutable Cache-Control header.
+    """
+    manifest = AssetManifest(app.static_folder, watch=app.debug or os.getenv("FLASK_DEBUG") == "1")
+    app.extensions["assets"] = manifest
+    static_view = app.view_functions["static"]
+
+    def fingerprinted_static(filename):
+        original, current = manifest.resolve(filename)
+        response = static_view(filename=original)
+        if current:
+            response.cache_control.public = True
+            response.cache_control.max_age = IMMUTABLE_MAX_AGE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+    app.view_functions["static"] = fingerprinted_static
+
+    @app.template_global()
+    def asset_url(filename):
+        return url_for("static", filename=manifest.url_name(filename))
+
+    return manifest
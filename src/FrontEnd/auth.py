@@ -1,6 +1,14 @@
+import os
+import time
 from functools import wraps
+from typing import Dict, Optional
+
 from flask import session, redirect, url_for, request
 
+DEFAULT_DATABASE = "Zane_Dima"
+# Seconds before the cached profile in the session is fetched again
+USER_CONTEXT_TTL = int(os.getenv("USER_CONTEXT_TTL", "900"))
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -12,12 +20,41 @@ def login_required(f):
 def is_authenticated():
     return 'user_id' in session
 
-def get_current_user():
-    if is_authenticated():
+def load_user_context(user: Dict) -> Dict:
+    """
+    Resolve the tenant database and fetch the profile for a logged-in user
+    and keep them in the (server-side) session, so views and templates read
+    them without calling the backend.
+    """
+    from src.FrontEnd.services import backend_client
+    profile = backend_client.get_user_profile(user.get("username"))
+    if profile is None:
+        # Backend unavailable: keep what we had rather than dropping it
+        profile = user.get('profile') or {}
+    context = {
+        'id': user.get('id') or profile.get('_id'),
+        'username': user.get('username'),
+        'email': user.get('email') or profile.get('email'),
+        'database_name': user.get('database_name') or profile.get('database_name') or DEFAULT_DATABASE,
+        'profile': profile,
+        'loaded_at': time.time()
+    }
+    session['user'] = context
+    session['user_id'] = context['id']
+    session['username'] = context['username']
+    session['database_name'] = context['database_name']
+    return context
+
+def get_current_user() -> Optional[Dict]:
+    if not is_authenticated():
+        return None
+    context = session.get('user')
+    if context is None:
         return {
             'id': session.get('user_id'),
             'username': session.get('username'),
             'email': session.get('email')
         }
-    return None
-
+    if time.time() - context.get('loaded_at', 0) > USER_CONTEXT_TTL:
+        context = load_user_context(context)
+    return context
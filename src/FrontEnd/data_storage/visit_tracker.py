@@ -1,75 +1,236 @@
-import json
+import atexit
 import os
+import sqlite3
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+from flask import has_request_context, session
+
 STORAGE_DIR = Path(__file__).parent
-TRACKER_FILE = STORAGE_DIR / "visit_tracker.json"
+VISITS_DB = Path(os.getenv("VISITS_DB", STORAGE_DIR / "visits.db"))
+# Seconds between flushes of buffered visit counts to VISITS_DB
+FLUSH_INTERVAL = float(os.getenv("VISITS_FLUSH_INTERVAL", "5"))
+# Flush early once this many (user, endpoint) pairs are waiting
+FLUSH_MAX_PENDING = 500
+
+_lock = threading.Lock()
+# user_id -> {endpoint: {"endpoint", "title", "icon", "count", "last_visited"}}
+_visits = {}
+# (user_id, endpoint) -> {"title", "icon", "count", "last_visited"} not yet written
+_pending = {}
+# The batch a flush is currently writing
+_flushing = {}
+_flush_wakeup = threading.Event()
+_flusher_pid = None
+
+
+def _connect():
+    conn = sqlite3.connect(VISITS_DB, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS visits (
+            user_id TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            title TEXT,
+            icon TEXT,
+            count INTEGER NOT NULL DEFAULT 0,
+            last_visited TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (user_id, endpoint)
+        )
+    """)
+    return conn
+
+
+def _current_user_id(user_id=None):
+    if user_id is not None:
+        return str(user_id)
+    if has_request_context():
+        return str(session.get("user_id") or "")
+    return ""
+
 
-def load_visits():
-    if not TRACKER_FILE.exists():
-        return {"visits": []}
+def _read_user(user_id):
     try:
-        with open(TRACKER_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return {"visits": []}
+        conn = _connect()
+        try:
+            return conn.execute(
+                "SELECT endpoint, title, icon, count, last_visited FROM visits WHERE user_id = ?",
+                (user_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return []
+
+
+def _merge(user_id, rows):
+    """Build a user's visit index from stored rows plus visits not yet stored.
+
+    Call with _lock held.
+    """
+    visits = {
+        endpoint: {"endpoint": endpoint, "title": title, "icon": icon,
+                   "count": count, "last_visited": last_visited}
+        for endpoint, title, icon, count, last_visited in rows
+    }
+    for buffered in (_flushing, _pending):
+        for (pending_user, endpoint), delta in buffered.items():
+            if pending_user != user_id:
+                continue
+            visit = visits.setdefault(endpoint, {"endpoint": endpoint, "count": 0, "last_visited": ""})
+            visit["title"] = delta["title"]
+            visit["icon"] = delta["icon"]
+            visit["count"] += delta["count"]
+            visit["last_visited"] = max(visit["last_visited"], delta["last_visited"])
+    return visits
+
+
+def _user_visits(user_id):
+    with _lock:
+        visits = _visits.get(user_id)
+        if visits is not None:
+            return list(visits.values())
+    rows = _read_user(user_id)
+    with _lock:
+        visits = _visits.get(user_id)
+        if visits is None:
+            visits = _visits[user_id] = _merge(user_id, rows)
+        return list(visits.values())
 
-def save_visits(data):
+
+def flush():
+    """Write buffered visit counts to VISITS_DB.
+
+    Counts are added to what is stored, so several workers can flush the
+    same user and endpoint without losing visits.
+    """
+    global _flushing
+    with _lock:
+        if not _pending or _flushing:
+            return
+        _flushing = dict(_pending)
+        _pending.clear()
+
+    rows = [
+        (user_id, endpoint, delta["title"], delta["icon"], delta["count"], delta["last_visited"])
+        for (user_id, endpoint), delta in _flushing.items()
+    ]
     try:
-        with open(TRACKER_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-    except IOError:
-        pass
-
-def track_visit(endpoint, title, icon):
-    data = load_visits()
-    visits = data.get("visits", [])
-    
-    existing = next((v for v in visits if v.get("endpoint") == endpoint), None)
-    
-    if existing:
-        existing["count"] = existing.get("count", 0) + 1
-        existing["last_visited"] = datetime.now().isoformat()
-    else:
-        visits.append({
-            "endpoint": endpoint,
-            "title": title,
-            "icon": icon,
-            "count": 1,
-            "last_visited": datetime.now().isoformat()
-        })
-    
-    data["visits"] = visits
-    save_visits(data)
-
-def get_top_visits(limit=3):
-    data = load_visits()
-    visits = data.get("visits", [])
-    
+        conn = _connect()
+        try:
+            with conn:
+                conn.executemany("""
+                    INSERT INTO visits (user_id, endpoint, title, icon, count, last_visited)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, endpoint) DO UPDATE SET
+                        title = excluded.title,
+                        icon = excluded.icon,
+                        count = count + excluded.count,
+                        last_visited = MAX(last_visited, excluded.last_visited)
+                """, rows)
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        # Put the counts back so the next flush retries them
+        with _lock:
+            for key, delta in _flushing.items():
+                current = _pending.get(key)
+                if current is None:
+                    _pending[key] = delta
+                else:
+                    current["count"] += delta["count"]
+                    current["last_visited"] = max(current["last_visited"], delta["last_visited"])
+            _flushing = {}
+        return
+
+    with _lock:
+        _flushing = {}
+        user_ids = list(_visits)
+    # Pick up visits other workers flushed for users this worker has loaded
+    for user_id in user_ids:
+        rows = _read_user(user_id)
+        with _lock:
+            _visits[user_id] = _merge(user_id, rows)
+
+
+def _flush_loop():
+    while True:
+        _flush_wakeup.wait(FLUSH_INTERVAL)
+        _flush_wakeup.clear()
+        flush()
+
+
+def _ensure_flusher():
+    # Started per process, so workers forked after import get their own thread
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="visit-flush", daemon=True).start()
+
+
+atexit.register(flush)
+
+
+def track_visit(endpoint, title, icon, user_id=None):
+    user_id = _current_user_id(user_id)
+    now = datetime.now().isoformat()
+    _ensure_flusher()
+
+    with _lock:
+        visits = _visits.get(user_id)
+        if visits is not None:
+            visit = visits.get(endpoint)
+            if visit is None:
+                visits[endpoint] = {"endpoint": endpoint, "title": title, "icon": icon,
+                                    "count": 1, "last_visited": now}
+            else:
+                visit["count"] = visit.get("count", 0) + 1
+                visit["last_visited"] = now
+
+        delta = _pending.get((user_id, endpoint))
+        if delta is None:
+            _pending[(user_id, endpoint)] = {"title": title, "icon": icon, "count": 1, "last_visited": now}
+        else:
+            delta["count"] += 1
+            delta["last_visited"] = now
+        pending_count = len(_pending)
+
+    if pending_count >= FLUSH_MAX_PENDING:
+        _flush_wakeup.set()
+
+def get_top_visits(limit=3, user_id=None):
+    visits = _user_visits(_current_user_id(user_id))
+
     if not visits:
         return []
-    
+
     filtered_visits = [v for v in visits if v.get("endpoint") != "frontend.settings"]
-    
+
     if not filtered_visits:
         return []
-    
+
     def sort_key(x):
         count = x.get("count", 0)
         last_visited = x.get("last_visited", "")
         return (count, last_visited)
-    
+
     sorted_visits = sorted(filtered_visits, key=sort_key, reverse=True)
-    
-    return sorted_visits[:limit]
 
+    return [dict(v) for v in sorted_visits[:limit]]
+
+@lru_cache(maxsize=1)
 def get_category_mapping():
     try:
         from ..nav import NAV
     except ImportError:
         from src.FrontEnd.nav import NAV
-    
+
     mapping = {}
     for section in NAV:
         main_endpoint = section.get("endpoint")
@@ -81,28 +242,27 @@ def get_category_mapping():
                     mapping[child_endpoint] = main_endpoint
     return mapping
 
-def get_recent_visits(limit=3):
-    data = load_visits()
-    visits = data.get("visits", [])
-    
+def get_recent_visits(limit=3, user_id=None):
+    visits = _user_visits(_current_user_id(user_id))
+
     if not visits:
         return []
-    
+
     filtered_visits = [v for v in visits if v.get("endpoint") != "frontend.settings"]
-    
+
     if not filtered_visits:
         return []
-    
+
     category_mapping = get_category_mapping()
     category_data = {}
-    
+
     for visit in filtered_visits:
         endpoint = visit.get("endpoint")
         category_endpoint = category_mapping.get(endpoint)
-        
+
         if not category_endpoint or category_endpoint == "frontend.settings":
             continue
-        
+
         if category_endpoint not in category_data:
             try:
                 from ..nav import NAV
@@ -117,24 +277,23 @@ def get_recent_visits(limit=3):
                     "count": 0,
                     "last_visited": ""
                 }
-        
+
         if category_endpoint in category_data:
             category_data[category_endpoint]["count"] += visit.get("count", 0)
             visit_time = visit.get("last_visited", "")
             if visit_time > category_data[category_endpoint]["last_visited"]:
                 category_data[category_endpoint]["last_visited"] = visit_time
-    
+
     category_list = list(category_data.values())
-    
+
     if not category_list:
         return []
-    
+
     def sort_key(x):
         last_visited = x.get("last_visited", "")
         count = x.get("count", 0)
         return (last_visited, count)
-    
+
     sorted_visits = sorted(category_list, key=sort_key, reverse=True)
-    
-    return sorted_visits[:limit]
 
+    return sorted_visits[:limit]
@@ -0,0 +1,64 @@
+import os
+import threading
+from typing import Dict, Hashable
+
+from flask import Flask, current_app, render_template, request
+from markupsafe import Markup
+
+# Set FRAGMENT_CACHE=0 to render fragments on every request
+FRAGMENT_CACHE_ENABLED = os.getenv("FRAGMENT_CACHE", "1") != "0"
+
+
+class FragmentCache:
+    """
+    Rendered template fragments keyed by template, endpoint, auth state,
+    the context passed in and an optional caller key. Only for markup that
+    does not depend on the user or on data that changes while the app runs.
+    Fragments whose context isn't hashable are rendered without caching.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._fragments: Dict[tuple, Markup] = {}
+        self._lock = threading.Lock()
+
+    def render(self, template_name: str, authenticated: bool, key: Hashable = None, **context) -> Markup:
+        # Off in debug mode so template edits show up
+        enabled = self.enabled and not current_app.debug
+        cache_key = (template_name, request.endpoint, authenticated, key, tuple(sorted(context.items())))
+        try:
+            hash(cache_key)
+        except TypeError:
+            enabled = False
+        fragment = self._fragments.get(cache_key) if enabled else None
+        if fragment is not None:
+            self.hits += 1
+            return fragment
+        self.misses += 1
+        fragment = Markup(render_template(template_name, **context))
+        if enabled:
+            with self._lock:
+                self._fragments[cache_key] = fragment
+        return fragment
+
+    def clear(self):
+        with self._lock:
+            self._fragments.clear()
+
+
+def init_fragments(app: Flask) -> FragmentCache:
+    """
+    Add a `cached_fragment(template_name, key=None, **context)` template
+    global that renders a partial once per endpoint, auth state and context.
+    """
+    cache = FragmentCache(enabled=FRAGMENT_CACHE_ENABLED)
+    app.extensions["fragments"] = cache
+
+    @app.template_global()
+    def cached_fragment(template_name, key=None, **context):
+        from src.FrontEnd.auth import is_authenticated
+        return cache.render(template_name, is_authenticated(), key, **context)
+
+    return cache
@@ -1,37 +1,56 @@
-from src.FrontEnd.routes import notification_queue
+from src.FrontEnd.notifications import broker
 
 
-def create_compare_notification(doc_id, title="Document Comparison"):
-    """Creates a compare notification"""
+def _publish(notification, user_id=None, *, targeted=False):
+    if targeted and not user_id:
+        # Pipeline results (contract diffs, forms, payments) must never be broadcast
+        raise ValueError(f"A {notification['type']} notification needs the user_id it is for")
+    broker.publish(notification, user_id=user_id)
+
+
+def create_compare_notification(doc_id, title="Document Comparison", *, user_id):
+    """Creates a compare notification for user_id"""
     notification = {
         'type': 'compare',
         'title': title,
         'message': 'Document differences have been detected.',
         'data': {'docId': doc_id}
     }
-    notification_queue.put(notification)
+    _publish(notification, user_id, targeted=True)
     return notification
 
 
-def create_form_notification(form_id, title="Form Ready"):
-    """Creates a form notification"""
+def create_form_notification(form_id, title="Form Ready", *, user_id):
+    """Creates a form notification for user_id"""
     notification = {
         'type': 'form',
         'title': title,
         'message': 'A form has been filled and is ready for review.',
         'data': {'formId': form_id}
     }
-    notification_queue.put(notification)
+    _publish(notification, user_id, targeted=True)
     return notification
 
 
-def create_transaction_notification(transaction_id, title="Transaction Pending"):
-    """Creates a transaction notification"""
+def create_transaction_notification(transaction_id, title="Transaction Pending", *, user_id):
+    """Creates a transaction notification for user_id"""
     notification = {
         'type': 'transaction',
         'title': title,
         'message': 'A transaction requires your confirmation.',
         'data': {'transactionId': transaction_id}
     }
-    notification_queue.put(notification)
+    _publish(notification, user_id, targeted=True)
+    return notification
+
+
+def create_generic_notification(title, message, notification_type="info", data=None, *, user_id=None):
+    """Creates a generic notification for user_id (everyone if None)"""
+    notification = {
+        'type': notification_type,
+        'title': title,
+        'message': message,
+        'data': data or {}
+    }
+    _publish(notification, user_id)
     return notification
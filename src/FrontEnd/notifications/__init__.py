@@ -0,0 +1,14 @@
+from .broker import NotificationBroker, Subscription, broker
+from .log import NotificationLog
+from .transport import NotificationTransport, InProcessTransport, SQLiteTransport, make_transport
+from .sse import (
+    SSEServer, init_sse, format_event, parse_last_event_id,
+    FLASK_STREAM_LIMIT, FLASK_STREAM_SECONDS, FLASK_STREAM_BUSY_RETRY_MS
+)
+
+__all__ = [
+    'NotificationBroker', 'Subscription', 'broker', 'NotificationLog',
+    'NotificationTransport', 'InProcessTransport', 'SQLiteTransport', 'make_transport',
+    'SSEServer', 'init_sse', 'format_event', 'parse_last_event_id',
+    'FLASK_STREAM_LIMIT', 'FLASK_STREAM_SECONDS', 'FLASK_STREAM_BUSY_RETRY_MS',
+]
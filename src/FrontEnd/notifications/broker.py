@@ -0,0 +1,188 @@
+import itertools
+import sqlite3
+import threading
+from collections import deque
+from typing import Callable, Dict, List, Optional, Set
+
+from src.Monitoring import Counter, CallbackGauge
+
+from .log import NotificationLog
+from .transport import InProcessTransport, NotificationTransport, make_transport
+
+# Notifications kept per subscriber while its client is not reading
+SUBSCRIBER_BUFFER_SIZE = 100
+
+
+class Subscription:
+    """One connected client: a bounded buffer that drops its oldest entries when full."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, user_id: Optional[str], buffer_size: int = SUBSCRIBER_BUFFER_SIZE):
+        self.id = next(self._ids)
+        self.user_id = user_id
+        self.buffer = deque(maxlen=buffer_size)
+        self.dropped = 0
+        self.closed = False
+        # Event ids recently handed out, so replayed and live copies are not
+        # sent twice. A set rather than the highest id: ids from concurrent
+        # publishers can arrive out of order and must still be delivered
+        self._sent_ids: Set[int] = set()
+        self._sent_order = deque()
+        self._sent_limit = buffer_size * 4
+        # Called after each notification is buffered, from the publishing thread
+        self.on_put: Optional[Callable[[], None]] = None
+        self._cond = threading.Condition()
+
+    def _put(self, notification: Dict) -> bool:
+        """Buffer a notification; returns False if an older one was dropped for it."""
+        with self._cond:
+            full = len(self.buffer) == self.buffer.maxlen
+            if full:
+                self.dropped += 1
+            self.buffer.append(notification)
+            self._cond.notify_all()
+        if self.on_put is not None:
+            self.on_put()
+        return not full
+
+    def _replay(self, notifications: List[Dict]):
+        """Put logged notifications ahead of live ones, in id order."""
+        with self._cond:
+            merged = {n["id"]: n for n in notifications}
+            live = [n for n in self.buffer if n.get("id") is None]
+            merged.update((n["id"], n) for n in self.buffer if n.get("id") is not None)
+            self.buffer.clear()
+            self.buffer.extend(merged[i] for i in sorted(merged))
+            self.buffer.extend(live)
+            self._cond.notify_all()
+        if self.on_put is not None:
+            self.on_put()
+
+    def get(self, timeout: Optional[float] = None) -> List[Dict]:
+        """Wait up to `timeout` seconds and return everything buffered so far."""
+        with self._cond:
+            if not self.buffer and not self.closed:
+                self._cond.wait(timeout)
+            items = []
+            for notification in self.buffer:
+                event_id = notification.get("id")
+                if event_id is not None:
+                    if event_id in self._sent_ids:
+                        continue
+                    self._remember(event_id)
+                items.append(notification)
+            self.buffer.clear()
+        return items
+
+    def _remember(self, event_id: int):
+        self._sent_ids.add(event_id)
+        self._sent_order.append(event_id)
+        if len(self._sent_order) > self._sent_limit:
+            self._sent_ids.discard(self._sent_order.popleft())
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class NotificationBroker:
+    """
+    Fans each notification out to every subscription of its target user.
+    Notifications published without a user go to every subscriber. With a
+    log, notifications get ids and reconnecting clients can replay them.
+    The transport decides which processes' subscribers a publish reaches.
+    """
+
+    def __init__(self, buffer_size: int = SUBSCRIBER_BUFFER_SIZE, log: Optional[NotificationLog] = None,
+                 transport: Optional[NotificationTransport] = None):
+        self.buffer_size = buffer_size
+        self.log = log
+        self.transport = transport or InProcessTransport(log)
+        self.transport.bind(self._fan_out)
+        self._subscribers: Dict[Optional[str], Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self.published = Counter(
+            "notifications_published_total", "Notifications published to the broker.")
+        self.delivered = Counter(
+            "notifications_delivered_total", "Notifications buffered for a subscriber.")
+        self.dropped = Counter(
+            "notifications_dropped_total", "Buffered notifications dropped because a subscriber fell behind.")
+
+    def subscribe(self, user_id: Optional[str] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Open a subscription. With last_event_id, logged notifications after
+        that id are replayed first (at most one buffer's worth).
+        """
+        self.transport.listen()
+        subscription = Subscription(user_id, self.buffer_size)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        if last_event_id is not None and self.log is not None:
+            # Registered before reading the log, so nothing published in between is missed
+            try:
+                subscription._replay(self.log.since(last_event_id, user_id, limit=self.buffer_size))
+            except sqlite3.Error:
+                pass
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscription.close()
+        with self._lock:
+            subs = self._subscribers.get(subscription.user_id)
+            if subs is not None:
+                subs.discard(subscription)
+                if not subs:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, notification: Dict, user_id: Optional[str] = None) -> Optional[int]:
+        """Send to `user_id`'s subscribers (all subscribers if None); returns the log id, if any."""
+        event_id = self.transport.publish(notification, user_id)
+        self.published.inc()
+        return event_id
+
+    def _fan_out(self, notification: Dict, user_id: Optional[str] = None):
+        """Buffer a notification for this process's matching subscriptions."""
+        with self._lock:
+            if user_id is None:
+                targets = [s for subs in self._subscribers.values() for s in subs]
+            else:
+                targets = list(self._subscribers.get(user_id, ()))
+        for subscription in targets:
+            if not subscription._put(notification):
+                self.dropped.inc()
+        self.delivered.inc(len(targets))
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+    def backlog(self) -> int:
+        """Notifications buffered but not yet read, across all subscribers."""
+        with self._lock:
+            subs = [s for group in self._subscribers.values() for s in group]
+        return sum(len(s.buffer) for s in subs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            users = len(self._subscribers)
+        return {
+            "subscribers": self.subscriber_count(),
+            "users": users,
+            "backlog": self.backlog(),
+        }
+
+    def metrics(self) -> list:
+        """Metrics to add to the app's MetricsRegistry."""
+        return [
+            self.published,
+            self.delivered,
+            self.dropped,
+            CallbackGauge("notification_subscribers", "Open notification subscriptions.", self.subscriber_count),
+            CallbackGauge("notification_backlog", "Notifications buffered for subscribers.", self.backlog),
+        ]
+
+
+_log = NotificationLog()
+broker = NotificationBroker(log=_log, transport=make_transport(_log))
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+NOTIFICATIONS_DB = Path(os.getenv(
+    "NOTIFICATIONS_DB", Path(__file__).resolve().parent.parent / "data_storage" / "notifications.db"
+))
+# Entries older than this are removed when the log is compacted
+RETENTION_DAYS = float(os.getenv("NOTIFICATIONS_RETENTION_DAYS", "7"))
+# Newest entries kept per user (broadcasts count as one user)
+MAX_PER_USER = int(os.getenv("NOTIFICATIONS_MAX_PER_USER", "500"))
+# Compact after every this many appends
+COMPACT_EVERY = 200
+
+
+class NotificationLog:
+    """
+    Append-only notification log in SQLite. Ids come from AUTOINCREMENT, so
+    they only grow, also across processes sharing the file, and double as
+    SSE event ids for Last-Event-ID replay.
+    """
+
+    def __init__(self, path=NOTIFICATIONS_DB, retention_days: float = RETENTION_DAYS,
+                 max_per_user: int = MAX_PER_USER):
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self.max_per_user = max_per_user
+        self._schema_ready = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS notifications (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user ON notifications (user_id, id)")
+            self._schema_ready = True
+        return conn
+
+    def append(self, notification: Dict, user_id: Optional[str] = None) -> int:
+        """Store a notification for user_id (None = everyone); returns its id."""
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO notifications (user_id, payload, created_at) VALUES (?, ?, ?)",
+                    (user_id, json.dumps(notification), time.time())
+                )
+            event_id = cursor.lastrowid
+        finally:
+            conn.close()
+        if event_id % COMPACT_EVERY == 0:
+            self.compact()
+        return event_id
+
+    def since(self, last_id: int, user_id: Optional[str] = None, limit: int = 100) -> List[Dict]:
+        """
+        The `limit` newest entries after last_id that user_id should see (its
+        own and broadcasts), oldest first, each with its "id".
+        """
+        if user_id is None:
+            where, params = "user_id IS NULL", ()
+        else:
+            where, params = "(user_id = ? OR user_id IS NULL)", (user_id,)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT id, payload FROM notifications WHERE id > ? AND {where} ORDER BY id DESC LIMIT ?",
+                (last_id, *params, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(json.loads(payload), id=event_id) for event_id, payload in reversed(rows)]
+
+    def tail(self, last_id: int, limit: int = 500) -> List[Tuple[Optional[str], Dict]]:
+        """Entries after last_id for every user, oldest first, as (user_id, notification)."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT id, user_id, payload FROM notifications WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, limit)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [(user_id, dict(json.loads(payload), id=event_id)) for event_id, user_id, payload in rows]
+
+    def last_id(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT IFNULL(MAX(id), 0) FROM notifications").fetchone()[0]
+        finally:
+            conn.close()
+
+    def compact(self) -> int:
+        """Drop entries past the retention period or beyond MAX_PER_USER; returns how many."""
+        cutoff = time.time() - self.retention_days * 86400
+        conn = self._connect()
+        try:
+            with conn:
+                removed = conn.execute("DELETE FROM notifications WHERE created_at < ?", (cutoff,)).rowcount
+                removed += conn.execute("""
+                    DELETE FROM notifications WHERE id IN (
+                        SELECT id FROM (
+                            SELECT id, ROW_NUMBER() OVER (
+                                PARTITION BY IFNULL(user_id, '') ORDER BY id DESC
+                            ) AS position
+                            FROM notifications
+                        ) WHERE position > ?
+                    )
+                """, (self.max_per_user,)).rowcount
+        finally:
+            conn.close()
+        return removed
@@ -0,0 +1,254 @@
+import asyncio
+import json
+import os
+import threading
+from http.cookies import SimpleCookie
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .broker import NotificationBroker
+
+# Port of the event-driven notification stream; "0" serves it from Flask only
+SSE_PORT = int(os.getenv("NOTIFICATIONS_SSE_PORT", "5002"))
+SSE_HOST = os.getenv("NOTIFICATIONS_SSE_HOST", "127.0.0.1")
+# Path on the site's own origin that the reverse proxy forwards to SSE_PORT;
+# empty if there is no such route (proxied pages then use the Flask fallback)
+SSE_PUBLIC_PATH = os.getenv("NOTIFICATIONS_SSE_PATH", "/notifications/events")
+# Seconds between keepalive comments on an idle stream
+HEARTBEAT_INTERVAL = float(os.getenv("NOTIFICATIONS_HEARTBEAT", "15"))
+STREAM_PATH = "/notifications/stream"
+MAX_HEADER_BYTES = 16 * 1024
+
+# The Flask route is only a fallback: it holds a worker thread per open tab, so
+# each process serves at most FLASK_STREAM_LIMIT of them, each for at most
+# FLASK_STREAM_SECONDS before the browser reconnects (resuming from Last-Event-ID)
+FLASK_STREAM_LIMIT = int(os.getenv("NOTIFICATIONS_FLASK_STREAMS", "8"))
+FLASK_STREAM_SECONDS = float(os.getenv("NOTIFICATIONS_FLASK_STREAM_SECONDS", "60"))
+# Reconnect delay sent to browsers turned away because every fallback slot is taken
+FLASK_STREAM_BUSY_RETRY_MS = 30000
+
+
+def format_event(notification: dict) -> bytes:
+    event_id = notification.get("id")
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}data: {json.dumps(notification)}\n\n".encode("utf-8")
+
+
+def parse_last_event_id(*candidates: Optional[str]) -> Optional[int]:
+    """First usable id from the Last-Event-ID header or the last_event_id parameter."""
+    for value in candidates:
+        try:
+            return max(int(value), 0)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+class SSEServer:
+    """
+    Serves /notifications/stream from one asyncio loop on a background thread.
+
+    An idle connection is a socket plus a broker subscription, not a WSGI
+    thread. Subscriptions wake the loop through call_soon_threadsafe when a
+    notification is published from any thread.
+    """
+
+    def __init__(self, broker: NotificationBroker, user_loader: Callable[[str], Optional[str]],
+                 host: str = SSE_HOST, port: int = SSE_PORT, heartbeat: float = HEARTBEAT_INTERVAL,
+                 cookie_name: str = "session"):
+        self.broker = broker
+        self.user_loader = user_loader
+        self.cookie_name = cookie_name
+        # Direct requests use STREAM_PATH; the reverse proxy passes SSE_PUBLIC_PATH through
+        self.paths = {path for path in (STREAM_PATH, SSE_PUBLIC_PATH) if path}
+        self.host = host
+        self.port = port
+        self.heartbeat = heartbeat
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.connections = 0
+        self.error: Optional[OSError] = None
+        self._started = threading.Event()
+
+    def start(self) -> bool:
+        """Start serving; returns False if the port could not be opened."""
+        threading.Thread(target=self._run, name="notifications-sse", daemon=True).start()
+        self._started.wait(5)
+        return self.running
+
+    @property
+    def running(self) -> bool:
+        return self._started.is_set() and self.error is None
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            # reuse_port lets every worker process of the frontend listen on the same port
+            server = self.loop.run_until_complete(asyncio.start_server(
+                self._handle, self.host, self.port, reuse_address=True, reuse_port=True,
+                limit=MAX_HEADER_BYTES
+            ))
+        except OSError as e:
+            self.error = e
+            self._started.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._started.set()
+        self.loop.run_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=10)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+
+        lines = head.decode("latin-1").split("\r\n")
+        method, target = (lines[0].split(" ") + ["", ""])[:2]
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(":")
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        if method != "GET" or urlsplit(target).path not in self.paths:
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await self._close(writer)
+            return
+
+        cookie = SimpleCookie()
+        try:
+            cookie.load(headers.get("cookie", ""))
+        except Exception:
+            pass
+        session_cookie = cookie.get(self.cookie_name)
+        user_id = self.user_loader(session_cookie.value) if session_cookie else None
+        if user_id is None:
+            writer.write(b"HTTP/1.1 401 Unauthorized\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await self._close(writer)
+            return
+
+        response = [
+            "HTTP/1.1 200 OK",
+            "Content-Type: text/event-stream",
+            "Cache-Control: no-cache",
+            "X-Accel-Buffering: no",
+        ]
+        origin = headers.get("origin")
+        if origin and urlsplit(origin).hostname == urlsplit(f"//{headers.get('host', '')}").hostname:
+            response += [f"Access-Control-Allow-Origin: {origin}", "Access-Control-Allow-Credentials: true"]
+        writer.write(("\r\n".join(response) + "\r\n\r\nretry: 3000\n\n").encode("latin-1"))
+
+        query = parse_qs(urlsplit(target).query)
+        last_event_id = parse_last_event_id(headers.get("last-event-id"), *query.get("last_event_id", []))
+
+        wakeup = asyncio.Event()
+        subscription = await self.loop.run_in_executor(None, self.broker.subscribe, user_id, last_event_id)
+        subscription.on_put = lambda: self.loop.call_soon_threadsafe(wakeup.set)
+        # Clients send nothing after the request, so a finished read means they left
+        disconnected = asyncio.ensure_future(reader.read())
+        self.connections += 1
+        if subscription.buffer:
+            wakeup.set()
+        try:
+            while not disconnected.done():
+                woken = asyncio.ensure_future(wakeup.wait())
+                await asyncio.wait({woken, disconnected}, timeout=self.heartbeat,
+                                   return_when=asyncio.FIRST_COMPLETED)
+                woken.cancel()
+                wakeup.clear()
+                if disconnected.done():
+                    break
+                notifications = subscription.get(timeout=0)
+                writer.write(b"".join(format_event(n) for n in notifications) or b": keepalive\n\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.connections -= 1
+            self.broker.unsubscribe(subscription)
+            disconnected.cancel()
+            await self._close(writer)
+
+    async def _close(self, writer: asyncio.StreamWriter):
+        try:
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def _forwarded(headers, name: str) -> Optional[str]:
+    """First value of X-Forwarded-<Name>, or the matching Forwarded parameter."""
+    value = headers.get(f"X-Forwarded-{name}")
+    if value:
+        return value.split(",")[0].strip()
+    for part in headers.get("Forwarded", "").split(",")[0].split(";"):
+        key, sep, val = part.strip().partition("=")
+        if sep and key.lower() == name.lower():
+            return val.strip('"')
+    return None
+
+
+def init_sse(app, broker: NotificationBroker):
+    """
+    Serve the notification stream from an SSEServer on SSE_PORT, started on
+    the first request so only processes that serve requests open the port.
+    Templates get `notifications_stream_url`:
+
+    - behind a reverse proxy, SSE_PUBLIC_PATH on the forwarded scheme and
+      host, which the proxy routes to the SSE server (same origin);
+    - on a direct plain-HTTP request, the SSE server's own port;
+    - otherwise (TLS without a proxy, SSE server disabled or not running)
+      the capped Flask route.
+    """
+    from flask import request, url_for
+
+    lock = threading.Lock()
+
+    def load_user(cookie_value):
+        interface = app.session_interface
+        if hasattr(interface, "read"):
+            # Server-side sessions: the cookie only carries the session id
+            data = interface.read(app, cookie_value)
+            return data["values"].get("user_id") if data else None
+        serializer = interface.get_signing_serializer(app)
+        if serializer is None:
+            return None
+        try:
+            data = serializer.loads(cookie_value, max_age=int(app.permanent_session_lifetime.total_seconds()))
+        except Exception:
+            return None
+        return data.get("user_id")
+
+    def get_server():
+        server = app.extensions.get("notifications_sse")
+        if server is None and SSE_PORT:
+            with lock:
+                server = app.extensions.get("notifications_sse")
+                if server is None:
+                    server = SSEServer(broker, load_user, cookie_name=app.config["SESSION_COOKIE_NAME"])
+                    if not server.start():
+                        print(f"[WARN] Notification stream server not started on port {SSE_PORT}: {server.error}")
+                    app.extensions["notifications_sse"] = server
+        return server
+
+    @app.context_processor
+    def inject_notifications_stream_url():
+        server = get_server()
+        if server is None or not server.running:
+            return {"notifications_stream_url": url_for("frontend.notification_stream")}
+        proxied = any(h in request.headers for h in ("X-Forwarded-Proto", "X-Forwarded-Host", "Forwarded"))
+        if proxied:
+            if not SSE_PUBLIC_PATH:
+                return {"notifications_stream_url": url_for("frontend.notification_stream")}
+            scheme = _forwarded(request.headers, "Proto") or request.scheme
+            host = _forwarded(request.headers, "Host") or request.host
+            return {"notifications_stream_url": f"{scheme}://{host}{SSE_PUBLIC_PATH}"}
+        if request.scheme != "http":
+            # A plain-HTTP port can't be used from an HTTPS page
+            return {"notifications_stream_url": url_for("frontend.notification_stream")}
+        host = urlsplit(request.host_url).hostname
+        if ":" in host:
+            host = f"[{host}]"
+        return {"notifications_stream_url": f"http://{host}:{server.port}{STREAM_PATH}"}
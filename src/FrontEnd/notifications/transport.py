@@ -0,0 +1,113 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from .log import NotificationLog
+
+# "sqlite" shares notifications between processes through the notification log,
+# "inprocess" only reaches subscribers of the publishing process
+TRANSPORT = os.getenv("NOTIFICATIONS_TRANSPORT", "sqlite")
+# Seconds between polls of the shared log for notifications from other processes
+POLL_INTERVAL = float(os.getenv("NOTIFICATIONS_POLL_INTERVAL", "0.25"))
+
+Deliver = Callable[[Dict, Optional[str]], None]
+
+
+class NotificationTransport:
+    """
+    Carries published notifications to the subscribers of every process
+    that listens. The broker binds `deliver`, which fans a notification out
+    to this process's subscriptions.
+    """
+
+    def __init__(self):
+        self.deliver: Optional[Deliver] = None
+
+    def bind(self, deliver: Deliver):
+        self.deliver = deliver
+
+    def publish(self, notification: Dict, user_id: Optional[str] = None) -> Optional[int]:
+        """Send a notification; returns its log id, if it has one."""
+        raise NotImplementedError
+
+    def listen(self):
+        """Start receiving in this process; called before the first subscription."""
+
+
+class InProcessTransport(NotificationTransport):
+    """Delivers straight to this process's subscribers, logging first when a log is given."""
+
+    def __init__(self, log: Optional[NotificationLog] = None):
+        super().__init__()
+        self.log = log
+
+    def publish(self, notification, user_id=None):
+        event_id = None
+        if self.log is not None:
+            try:
+                event_id = self.log.append(notification, user_id)
+                notification = dict(notification, id=event_id)
+            except sqlite3.Error:
+                pass
+        self.deliver(notification, user_id)
+        return event_id
+
+
+class SQLiteTransport(NotificationTransport):
+    """
+    Publishes by appending to the shared NotificationLog. Each listening
+    process tails the log on a background thread and delivers new entries
+    in id order, so workers, the Gmail poller and src/main.py workflows all
+    reach every SSE client whichever process serves it.
+    """
+
+    def __init__(self, log: NotificationLog, poll_interval: float = POLL_INTERVAL):
+        super().__init__()
+        self.log = log
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listener_pid = None
+
+    def publish(self, notification, user_id=None):
+        try:
+            return self.log.append(notification, user_id)
+        except sqlite3.Error:
+            # Log unavailable: still reach this process's subscribers
+            self.deliver(notification, user_id)
+            return None
+
+    def listen(self):
+        # Per process: a worker forked after the listener started needs its own
+        if self._listener_pid == os.getpid():
+            return
+        with self._lock:
+            if self._listener_pid == os.getpid():
+                return
+            try:
+                last_id = self.log.last_id()
+            except sqlite3.Error:
+                last_id = 0
+            self._listener_pid = os.getpid()
+        threading.Thread(target=self._tail, args=(last_id,), name="notifications-tail", daemon=True).start()
+
+    def _tail(self, last_id: int):
+        while True:
+            try:
+                entries = self.log.tail(last_id)
+            except sqlite3.Error:
+                entries = []
+            for user_id, notification in entries:
+                last_id = notification["id"]
+                self.deliver(notification, user_id)
+            if not entries:
+                time.sleep(self.poll_interval)
+
+
+def make_transport(log: NotificationLog, kind: str = TRANSPORT) -> NotificationTransport:
+    if kind == "inprocess":
+        return InProcessTransport(log)
+    if kind == "sqlite":
+        return SQLiteTransport(log)
+    raise ValueError(f"Unknown notification transport: {kind}")
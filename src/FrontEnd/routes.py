@@ -1,14 +1,27 @@
-import json
-import queue
+import threading
+import time
 
 from flask import Blueprint, render_template, jsonify, request, session, redirect, url_for, Response
 from .data_storage.visit_tracker import get_top_visits, get_recent_visits, track_visit
 from .nav import NAV
-from .services import backend_client
-from .auth import login_required, is_authenticated, get_current_user
+from .static_matcher import get_matcher
+from .notifications import (
+    broker, format_event, parse_last_event_id,
+    FLASK_STREAM_LIMIT, FLASK_STREAM_SECONDS, FLASK_STREAM_BUSY_RETRY_MS
+)
+from .services import backend_client, get_documents, invalidate_documents
+from .auth import login_required, is_authenticated, get_current_user, load_user_context, DEFAULT_DATABASE
 
 bp = Blueprint("frontend", __name__)
 
+# Widest range /api/calendar serves in one call (a month view plus padding)
+MAX_CALENDAR_RANGE_DAYS = 62
+# Documents per page on /documents/recent, loaded as the user scrolls or clicks "Load more"
+RECENT_DOCUMENTS_PAGE_SIZE = 20
+MAX_RECENT_DOCUMENTS_PAGE_SIZE = 100
+# Open fallback notification streams in this process (see notification_stream)
+_flask_streams = threading.BoundedSemaphore(FLASK_STREAM_LIMIT)
+
 def get_page_info(endpoint):
     for section in NAV:
         if section.get("endpoint") == endpoint:
@@ -25,13 +38,14 @@ def track_page_visit(endpoint):
         if title and icon:
             track_visit(endpoint, title, icon)
 
-def get_category_items(category_name, static_items):
+def get_category_items(category_name, static_items, all_docs=None):
     from datetime import datetime, timedelta
     
     user_id = session.get("user_id")
     db_name = "Zane_Dima"
     
-    all_docs = backend_client.get_documents(db_name=db_name)
+    if all_docs is None:
+        all_docs = get_documents(db_name=db_name)
     
     category_prefix = category_name.capitalize()
     backend_docs = []
@@ -45,6 +59,7 @@ def get_category_items(category_name, static_items):
             backend_docs.append(doc)
     
     static_map = {item["title"]: item for item in static_items}
+    matcher = get_matcher(static_map.keys())
     
     items = []
     doc_titles = set()
@@ -88,19 +103,8 @@ def get_category_items(category_name, static_items):
         if not doc_status:
             doc_status = "need_attention"
         
-        static_item = None
-        if doc_title in static_map:
-            static_item = static_map[doc_title]
-        elif doc_name in static_map:
-            static_item = static_map[doc_name]
-        else:
-            for static_title, static_item_candidate in static_map.items():
-                if static_title in doc_title or doc_title in static_title:
-                    static_item = static_item_candidate
-                    break
-                elif static_title in doc_name or doc_name in static_title:
-                    static_item = static_item_candidate
-                    break
+        static_title = matcher.match(doc_title, doc_name)
+        static_item = static_map[static_title] if static_title is not None else None
         
         if static_item:
             item = static_item.copy()
@@ -174,76 +178,22 @@ def index():
     user_id = session.get("user_id")
     db_name = "Zane_Dima"
     
-    backend_docs = backend_client.get_documents(db_name=db_name)
-    
-    approvals = []
-    all_calendar_deadlines = []
-    from datetime import datetime
+    from datetime import datetime, timedelta
+    today = datetime.now()
+    # Only the current month is embedded; other months come from /api/calendar
+    snapshot = backend_client.get_dashboard(db_name=db_name) or {}
     
-    if backend_docs:
-        from datetime import timedelta
-        today = datetime.now().date()
-        two_months_from_now = today + timedelta(days=60)
-        
-        for i, doc in enumerate(backend_docs, 1):
-            deadlines = doc.get("deadlines", [])
-            if deadlines:
-                for deadline in deadlines:
-                    if isinstance(deadline, dict):
-                        deadline_date = deadline.get("date")
-                        deadline_desc = deadline.get("description", "Pending review")
-                    elif isinstance(deadline, list) and len(deadline) >= 2:
-                        deadline_date = deadline[0]
-                        deadline_desc = deadline[1] if len(deadline) > 1 else "Pending review"
-                    else:
-                        continue
-                    
-                    if not deadline_date:
-                        continue
-                    
-                    try:
-                        deadline_date_obj = datetime.strptime(deadline_date[:10], "%Y-%m-%d").date()
-                        deadline_display = deadline_date_obj.strftime("%d-%m-%Y")
-                        is_completed = deadline_date_obj < today
-                        
-                        deadline_item = {
-                            "id": doc.get("_id", i),
-                            "doc_id": doc.get("_id"),
-                            "title": doc.get("name", "Document"),
-                            "description": deadline_desc,
-                            "deadline_date": deadline_date,
-                            "deadline_display": deadline_display,
-                            "category": doc.get("category", ""),
-                            "is_completed": is_completed
-                        }
-                        
-                        all_calendar_deadlines.append(deadline_item)
-                        
-                        if deadline_date_obj <= two_months_from_now and deadline_date_obj >= today:
-                            approvals.append(deadline_item)
-                    except Exception:
-                        continue
+    approvals = snapshot.get("approvals", [])
+    calendar = snapshot.get("calendar") or {"start": None, "end": None, "days": {}}
     
     if not approvals:
-        from datetime import timedelta
-        today = datetime.now()
-    approvals = [
+        approvals = [
             {"id": 1, "title": "Q4 Tax Return Review", "description": "Pending review from finance team", "deadline_date": (today + timedelta(days=5)).strftime("%Y-%m-%d"), "deadline_display": (today + timedelta(days=5)).strftime("%d-%m-%Y"), "doc_id": None},
             {"id": 2, "title": "Asset Purchase Approval", "description": "New equipment request", "deadline_date": (today + timedelta(days=12)).strftime("%Y-%m-%d"), "deadline_display": (today + timedelta(days=12)).strftime("%d-%m-%Y"), "doc_id": None},
             {"id": 3, "title": "Contract Renewal", "description": "Service agreement extension", "deadline_date": (today + timedelta(days=20)).strftime("%Y-%m-%d"), "deadline_display": (today + timedelta(days=20)).strftime("%d-%m-%Y"), "doc_id": None},
         ]
     
-    def get_sort_date(item):
-        deadline_date = item.get("deadline_date", "9999-12-31")
-        try:
-            return datetime.strptime(deadline_date[:10], "%Y-%m-%d").date()
-        except Exception:
-            return datetime.strptime("9999-12-31", "%Y-%m-%d").date()
-    
-    approvals.sort(key=get_sort_date)
-    approvals = approvals[:5]
-    
-    return render_template("index.html", frequent=frequent, approvals=approvals, all_calendar_deadlines=all_calendar_deadlines)
+    return render_template("index.html", frequent=frequent, approvals=approvals, calendar=calendar)
 
 
 @bp.route("/login", methods=["GET", "POST"])
@@ -270,10 +220,9 @@ def login():
             return render_template("login.html", error=error_msg)
         
         if result.get("user"):
-            user = result["user"]
-            session["user_id"] = user.get("id")
-            session["username"] = user.get("username")
-            session["database_name"] = "Zane_Dima"
+            session.clear()
+            session.regenerate()
+            load_user_context(result["user"])
             
             if request.is_json:
                 next_url = request.args.get("next", url_for("frontend.index"))
@@ -336,24 +285,27 @@ def api_login():
 def api_register():
     return register()
 
+
+TAXES_STATIC_ITEMS = [
+    {"title": "VAT Return & Payment", "description": "File and pay your VAT returns", "endpoint": "frontend.vat_return_payment", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
+    {"title": "VAT ICP Report", "description": "Intra-Community transactions reporting", "endpoint": "frontend.vat_icp_report", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
+    {"title": "VAT OSS (One-Stop Shop)", "description": "One-stop shop for EU VAT", "endpoint": "frontend.vat_oss", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "need_attention"},
+    {"title": "VAT KOR", "description": "Small businesses scheme", "endpoint": "frontend.vat_kor", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
+    {"title": "VAT Article 23 (Import)", "description": "Import VAT reverse charge", "endpoint": "frontend.vat_article_23", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
+    {"title": "VAT Rates & Exemptions", "description": "View VAT rates and exemptions", "endpoint": "frontend.vat_rates_exemptions", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
+    {"title": "VAT / OB Numbers", "description": "Manage your VAT and OB numbers", "endpoint": "frontend.vat_ob_numbers", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
+    {"title": "VAT Supplement", "description": "Submit VAT supplements", "endpoint": "frontend.vat_supplement", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "need_attention"},
+    {"title": "Payroll Tax", "description": "Payroll tax declarations", "endpoint": "frontend.payroll_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/personeel-en-loon/content/loonaangifte-aangifte-loonheffingen/", "status": "pending"},
+    {"title": "Income Tax (IB)", "description": "Income tax filing", "endpoint": "frontend.income_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/prive/inkomstenbelasting/", "status": "completed"},
+    {"title": "Corporate Tax (VPB)", "description": "Corporate tax filing", "endpoint": "frontend.corporate_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/vennootschapsbelasting/", "status": "pending"},
+]
+
+
 @bp.route("/taxes")
 @login_required
 def taxes():
     track_visit("frontend.taxes", "Taxes", "receipt")
-    static_items = [
-        {"title": "VAT Return & Payment", "description": "File and pay your VAT returns", "endpoint": "frontend.vat_return_payment", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
-        {"title": "VAT ICP Report", "description": "Intra-Community transactions reporting", "endpoint": "frontend.vat_icp_report", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
-        {"title": "VAT OSS (One-Stop Shop)", "description": "One-stop shop for EU VAT", "endpoint": "frontend.vat_oss", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "need_attention"},
-        {"title": "VAT KOR", "description": "Small businesses scheme", "endpoint": "frontend.vat_kor", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
-        {"title": "VAT Article 23 (Import)", "description": "Import VAT reverse charge", "endpoint": "frontend.vat_article_23", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
-        {"title": "VAT Rates & Exemptions", "description": "View VAT rates and exemptions", "endpoint": "frontend.vat_rates_exemptions", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "pending"},
-        {"title": "VAT / OB Numbers", "description": "Manage your VAT and OB numbers", "endpoint": "frontend.vat_ob_numbers", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "completed"},
-        {"title": "VAT Supplement", "description": "Submit VAT supplements", "endpoint": "frontend.vat_supplement", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/btw/btw_aangifte_doen_en_betalen/", "status": "need_attention"},
-        {"title": "Payroll Tax", "description": "Payroll tax declarations", "endpoint": "frontend.payroll_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/personeel-en-loon/content/loonaangifte-aangifte-loonheffingen/", "status": "pending"},
-        {"title": "Income Tax (IB)", "description": "Income tax filing", "endpoint": "frontend.income_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/prive/inkomstenbelasting/", "status": "completed"},
-        {"title": "Corporate Tax (VPB)", "description": "Corporate tax filing", "endpoint": "frontend.corporate_tax", "info_url": "https://www.belastingdienst.nl/wps/wcm/connect/bldcontentnl/belastingdienst/zakelijk/vennootschapsbelasting/", "status": "pending"},
-    ]
-    items = get_category_items("taxes", static_items)
+    items = get_category_items("taxes", TAXES_STATIC_ITEMS)
     return render_template("section.html", title="Taxes", items=items)
 
 
@@ -424,17 +376,19 @@ def corporate_tax():
     return render_template("pages/taxes/corporate_tax.html")
 
 
+KVK_STATIC_ITEMS = [
+    {"title": "UBO Register", "description": "Ultimate beneficial owner registration", "endpoint": "frontend.ubo_register", "info_url": "https://www.kvk.nl/ubo/over-het-ubo-register/", "status": "pending"},
+    {"title": "UBO Extract", "description": "View UBO extract information", "endpoint": "frontend.ubo_extract", "info_url": "https://www.kvk.nl/ubo/over-het-ubo-register/", "status": "completed"},
+    {"title": "Annual Report Filing (SBR)", "description": "File annual reports via SBR", "endpoint": "frontend.annual_report_sbr", "info_url": "https://www.kvk.nl/deponeren/jaarrekening-deponeren/", "status": "need_attention"},
+    {"title": "Self-File Annual Report", "description": "Self-file your annual report", "endpoint": "frontend.self_file_annual_report", "info_url": "https://www.kvk.nl/deponeren/jaarrekening-deponeren/", "status": "pending"},
+]
+
+
 @bp.route("/kvk")
 @login_required
 def kvk():
     track_visit("frontend.kvk", "KvK", "building")
-    static_items = [
-        {"title": "UBO Register", "description": "Ultimate beneficial owner registration", "endpoint": "frontend.ubo_register", "info_url": "https://www.kvk.nl/ubo/over-het-ubo-register/", "status": "pending"},
-        {"title": "UBO Extract", "description": "View UBO extract information", "endpoint": "frontend.ubo_extract", "info_url": "https://www.kvk.nl/ubo/over-het-ubo-register/", "status": "completed"},
-        {"title": "Annual Report Filing (SBR)", "description": "File annual reports via SBR", "endpoint": "frontend.annual_report_sbr", "info_url": "https://www.kvk.nl/deponeren/jaarrekening-deponeren/", "status": "need_attention"},
-        {"title": "Self-File Annual Report", "description": "Self-file your annual report", "endpoint": "frontend.self_file_annual_report", "info_url": "https://www.kvk.nl/deponeren/jaarrekening-deponeren/", "status": "pending"},
-    ]
-    items = get_category_items("kvk", static_items)
+    items = get_category_items("kvk", KVK_STATIC_ITEMS)
     return render_template("section.html", title="KvK", items=items)
 
 
@@ -462,19 +416,21 @@ def self_file_annual_report():
     return render_template("pages/kvk/self_file_annual_report.html")
 
 
+CONTRACTS_STATIC_ITEMS = [
+    {"title": "Repository", "description": "View all contracts", "endpoint": "frontend.contracts_repository", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "completed"},
+    {"title": "Drafts", "description": "Manage contract drafts", "endpoint": "frontend.contracts_drafts", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
+    {"title": "Negotiations", "description": "Track contract negotiations", "endpoint": "frontend.contracts_negotiations", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "need_attention"},
+    {"title": "Approvals", "description": "Pending contract approvals", "endpoint": "frontend.contracts_approvals", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
+    {"title": "Signatures", "description": "Manage contract signatures", "endpoint": "frontend.contracts_signatures", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
+    {"title": "Obligations & Renewals", "description": "Track contract obligations and renewals", "endpoint": "frontend.contracts_obligations_renewals", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "completed"},
+]
+
+
 @bp.route("/contracts")
 @login_required
 def contracts():
     track_visit("frontend.contracts", "Contracts", "file-earmark-text")
-    static_items = [
-        {"title": "Repository", "description": "View all contracts", "endpoint": "frontend.contracts_repository", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "completed"},
-        {"title": "Drafts", "description": "Manage contract drafts", "endpoint": "frontend.contracts_drafts", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
-        {"title": "Negotiations", "description": "Track contract negotiations", "endpoint": "frontend.contracts_negotiations", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "need_attention"},
-        {"title": "Approvals", "description": "Pending contract approvals", "endpoint": "frontend.contracts_approvals", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
-        {"title": "Signatures", "description": "Manage contract signatures", "endpoint": "frontend.contracts_signatures", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "pending"},
-        {"title": "Obligations & Renewals", "description": "Track contract obligations and renewals", "endpoint": "frontend.contracts_obligations_renewals", "info_url": "https://www.rijksoverheid.nl/onderwerpen/contractenrecht", "status": "completed"},
-    ]
-    items = get_category_items("contracts", static_items)
+    items = get_category_items("contracts", CONTRACTS_STATIC_ITEMS)
     return render_template("section.html", title="Contracts", items=items)
 
 
@@ -514,17 +470,19 @@ def contracts_obligations_renewals():
     return render_template("pages/contracts/obligations_renewals.html")
 
 
+FINANCES_STATIC_ITEMS = [
+    {"title": "Bank Connections", "description": "Manage bank account connections", "endpoint": "frontend.bank_connections", "info_url": "https://www.afm.nl/", "status": "completed"},
+    {"title": "Transactions", "description": "View all financial transactions", "endpoint": "frontend.transactions", "info_url": "https://www.afm.nl/", "status": "pending"},
+    {"title": "Sales (Invoices)", "description": "Manage sales and invoices", "endpoint": "frontend.sales", "info_url": "https://www.rijksoverheid.nl/onderwerpen/facturen", "status": "need_attention"},
+    {"title": "Purchases (Bills)", "description": "Manage purchases and bills", "endpoint": "frontend.bills", "info_url": "https://www.rijksoverheid.nl/onderwerpen/facturen", "status": "pending"},
+]
+
+
 @bp.route("/finances")
 @login_required
 def finances():
     track_visit("frontend.finances", "Finances", "cash-coin")
-    static_items = [
-        {"title": "Bank Connections", "description": "Manage bank account connections", "endpoint": "frontend.bank_connections", "info_url": "https://www.afm.nl/", "status": "completed"},
-        {"title": "Transactions", "description": "View all financial transactions", "endpoint": "frontend.transactions", "info_url": "https://www.afm.nl/", "status": "pending"},
-        {"title": "Sales (Invoices)", "description": "Manage sales and invoices", "endpoint": "frontend.sales", "info_url": "https://www.rijksoverheid.nl/onderwerpen/facturen", "status": "need_attention"},
-        {"title": "Purchases (Bills)", "description": "Manage purchases and bills", "endpoint": "frontend.bills", "info_url": "https://www.rijksoverheid.nl/onderwerpen/facturen", "status": "pending"},
-    ]
-    items = get_category_items("finances", static_items)
+    items = get_category_items("finances", FINANCES_STATIC_ITEMS)
     return render_template("section.html", title="Finances", items=items)
 
 
@@ -552,21 +510,29 @@ def bills():
     return render_template("pages/finances/bills.html")
 
 
+DOCUMENTS_STATIC_ITEMS = [
+    {"title": "Uploads", "description": "Upload new documents", "endpoint": "frontend.documents_uploads", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
+    {"title": "Recent", "description": "Recently accessed documents", "endpoint": "frontend.documents_recent", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "pending"},
+    {"title": "Versions", "description": "Document version history", "endpoint": "frontend.documents_versions", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
+    {"title": "Templates", "description": "Document templates", "endpoint": "frontend.documents_templates", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "pending"},
+    {"title": "Search", "description": "Search documents", "endpoint": "frontend.documents_search", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
+]
+
+
 @bp.route("/documents")
 @login_required
 def documents():
     track_visit("frontend.documents", "Documents", "folder2")
-    static_items = [
-        {"title": "Uploads", "description": "Upload new documents", "endpoint": "frontend.documents_uploads", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
-        {"title": "Recent", "description": "Recently accessed documents", "endpoint": "frontend.documents_recent", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "pending"},
-        {"title": "Versions", "description": "Document version history", "endpoint": "frontend.documents_versions", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
-        {"title": "Templates", "description": "Document templates", "endpoint": "frontend.documents_templates", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "pending"},
-        {"title": "Search", "description": "Search documents", "endpoint": "frontend.documents_search", "info_url": "https://www.rijksoverheid.nl/onderwerpen/archief", "status": "completed"},
-    ]
     user_id = session.get("user_id")
     db_name = session.get("database_name")
-    backend_docs = backend_client.get_documents(db_name=db_name)
-    items = get_category_items("documents", static_items)
+    calls = {"documents": lambda: get_documents(db_name=db_name)}
+    # Category counts come from the default tenant; only fetch it separately when it's another database
+    if db_name and db_name != DEFAULT_DATABASE:
+        calls["category_docs"] = lambda: get_documents(db_name=DEFAULT_DATABASE)
+    results = backend_client.gather(calls, defaults={"documents": [], "category_docs": []})
+    backend_docs = results["documents"]
+    category_docs = results["category_docs"] if "category_docs" in calls else backend_docs
+    items = get_category_items("documents", DOCUMENTS_STATIC_ITEMS, all_docs=category_docs)
     return render_template("section.html", title="Documents", items=items, documents=backend_docs)
 
 
@@ -581,13 +547,11 @@ def documents_uploads():
 def documents_recent():
     track_page_visit("frontend.documents_recent")
     doc_id = request.args.get("doc_id")
-    user_id = session.get("user_id")
     db_name = session.get("database_name")
-    backend_docs = backend_client.get_documents(db_name=db_name)
-    selected_doc = None
-    if doc_id:
-        selected_doc = next((doc for doc in backend_docs if str(doc.get("_id")) == doc_id), None)
-    return render_template("pages/documents/recent.html", documents=backend_docs, selected_doc=selected_doc, selected_doc_id=doc_id)
+    # The list is loaded page by page from /api/documents/recent
+    selected_doc = backend_client.get_document(doc_id, db_name=db_name) if doc_id else None
+    return render_template("pages/documents/recent.html", selected_doc=selected_doc, selected_doc_id=doc_id,
+                           page_size=RECENT_DOCUMENTS_PAGE_SIZE)
 
 
 @bp.route("/documents/versions")
@@ -639,15 +603,59 @@ def settings():
 
 
 
+@bp.route("/api/calendar")
+@login_required
+def api_calendar():
+    """Deadlines between ?start= and ?end= (YYYY-MM-DD), bucketed by day"""
+    from datetime import datetime
+    try:
+        start = datetime.strptime(request.args.get("start", ""), "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get("end", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "start and end must be YYYY-MM-DD dates"}), 400
+    if end < start or (end - start).days > MAX_CALENDAR_RANGE_DAYS:
+        return jsonify({"error": f"Range must be between 0 and {MAX_CALENDAR_RANGE_DAYS} days"}), 400
+    
+    db_name = "Zane_Dima"
+    snapshot = backend_client.get_dashboard(
+        db_name=db_name,
+        calendar_start=start.isoformat(),
+        calendar_end=end.isoformat()
+    )
+    if snapshot is None:
+        return jsonify({"error": "Failed to load calendar"}), 503
+    response = jsonify(snapshot["calendar"])
+    response.headers["Cache-Control"] = "private, max-age=30"
+    return response
+
 @bp.route("/api/documents")
 @login_required
 def api_documents():
     category = request.args.get("category")
     user_id = session.get("user_id")
     db_name = "Zane_Dima"
-    docs = backend_client.get_documents(category, user_id, db_name)
+    docs = get_documents(db_name, category=category, user_id=user_id)
     return jsonify(docs)
 
+@bp.route("/api/documents/recent")
+@login_required
+def api_recent_documents():
+    """One page of documents, newest first: ?offset=&limit="""
+    offset = request.args.get("offset", 0, type=int)
+    limit = request.args.get("limit", RECENT_DOCUMENTS_PAGE_SIZE, type=int)
+    if offset < 0 or not 0 < limit <= MAX_RECENT_DOCUMENTS_PAGE_SIZE:
+        return jsonify({"error": f"offset must be >= 0 and limit between 1 and {MAX_RECENT_DOCUMENTS_PAGE_SIZE}"}), 400
+    
+    db_name = session.get("database_name")
+    # One extra row tells whether there is a next page
+    docs = backend_client.get_documents_page(offset=offset, limit=limit + 1, db_name=db_name)
+    if docs is None:
+        return jsonify({"error": "Failed to load documents"}), 503
+    return jsonify({
+        "documents": docs[:limit],
+        "next_offset": offset + limit if len(docs) > limit else None
+    })
+
 @bp.route("/api/documents", methods=["POST"])
 @login_required
 def api_create_document():
@@ -659,6 +667,7 @@ def api_create_document():
     if user_id:
         data["user_id"] = user_id
     result = backend_client.create_document(data, db_name=db_name)
+    invalidate_documents(db_name)
     if result:
         return jsonify(result), 201
     return jsonify({"error": "Failed to create document"}), 500
@@ -672,6 +681,7 @@ def api_update_document(doc_id):
             return jsonify({"error": "Invalid JSON"}), 400
         db_name = "Zane_Dima"
         result = backend_client.update_document(doc_id, data, db_name=db_name)
+        invalidate_documents(db_name)
         if result:
             return jsonify({"success": True, "message": "Document updated successfully"}), 200
         return jsonify({"error": "Failed to update document. Document may not exist or no changes were made."}), 404
@@ -683,6 +693,7 @@ def api_update_document(doc_id):
 def api_delete_document(doc_id):
     db_name = "Zane_Dima"
     result = backend_client.delete_document(doc_id, db_name=db_name)
+    invalidate_documents(db_name)
     if result:
         return jsonify(result), 200
     return jsonify({"error": "Failed to delete document"}), 500
@@ -707,20 +718,37 @@ def api_create_data():
     return jsonify({"error": "Failed to create data"}), 500
 
 
-notification_queue = queue.Queue()
-
-# Initialize notification helper with the queue
-from src.FrontEnd.notification_helper import set_notification_queue
-set_notification_queue(notification_queue)
-
 @bp.route('/notifications/stream')
+@login_required
 def notification_stream():
-    def event_stream():
-        while True:
-            notification = notification_queue.get()
-            yield f"data: {json.dumps(notification)}\n\n"
+    """Fallback for pages that can't reach the asyncio stream server (see init_sse)."""
+    if not _flask_streams.acquire(blocking=False):
+        # Every fallback slot is taken: have the browser retry later rather than hold a thread
+        return Response(f"retry: {FLASK_STREAM_BUSY_RETRY_MS}\n\n", mimetype='text/event-stream')
+    last_event_id = parse_last_event_id(request.headers.get("Last-Event-ID"), request.args.get("last_event_id"))
+    subscription = broker.subscribe(session.get("user_id"), last_event_id)
 
-    return Response(event_stream(), mimetype='text/event-stream')
+    def event_stream():
+        deadline = time.monotonic() + FLASK_STREAM_SECONDS
+        try:
+            while time.monotonic() < deadline:
+                notifications = subscription.get(timeout=min(15, max(deadline - time.monotonic(), 0)))
+                if not notifications:
+                    # Comment line, lets the server notice closed connections
+                    yield ": keepalive\n\n"
+                for notification in notifications:
+                    yield format_event(notification)
+        finally:
+            broker.unsubscribe(subscription)
+
+    def release():
+        # Also runs when the client left before the stream started
+        broker.unsubscribe(subscription)
+        _flask_streams.release()
+
+    response = Response(event_stream(), mimetype='text/event-stream')
+    response.call_on_close(release)
+    return response
 
 
 @bp.route('/test/notifications', methods=['GET', 'POST'])
@@ -735,24 +763,27 @@ def test_notifications():
     )
     
     notification_type = request.args.get('type', 'all')
+    user_id = session.get("user_id")
     
     if notification_type == 'compare' or notification_type == 'all':
         create_compare_notification(
             "Test comparison: Changes detected in rental contract. Key differences include updated rent amount and new terms.",
-            "doc123"
+            "doc123",
+            user_id=user_id
         )
     
     if notification_type == 'form' or notification_type == 'all':
         create_form_notification(
             "Form filled successfully. All fields have been completed using your database information.",
             "form456",
-            "filled_output.pdf"
+            user_id=user_id
         )
     
     if notification_type == 'transaction' or notification_type == 'all':
         create_transaction_notification(
             "Transaction is pending. Please review and confirm to process.",
-            "trans789"
+            "trans789",
+            user_id=user_id
         )
     
     if notification_type == 'generic' or notification_type == 'all':
@@ -760,11 +791,12 @@ def test_notifications():
             "Test Notification",
             "This is a generic test notification to verify the notification system is working.",
             "info",
-            {"test": True}
+            {"test": True},
+            user_id=user_id
         )
     
     return jsonify({
         "success": True,
         "message": f"Test notifications sent (type: {notification_type})",
-        "queue_size": notification_queue.qsize()
+        "broker": broker.stats()
     }), 200
@@ -1,4 +1,5 @@
 from .backend_client import backend_client
+from .data_access import get_documents, invalidate_documents
 
-__all__ = ['backend_client']
+__all__ = ['backend_client', 'get_documents', 'invalidate_documents']
 
@@ -1,39 +1,143 @@
 import requests
+import copy
 import os
-from typing import Optional, Dict, List, Any
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, List, Any, Callable
 
 # Backend API base URL - defaults to localhost:5001
 BACKEND_URL = os.getenv("BACKEND_URL", "http://95.179.191.126:5001")
 
+CONNECT_TIMEOUT = float(os.getenv("BACKEND_CONNECT_TIMEOUT", "2"))
+READ_TIMEOUT = float(os.getenv("BACKEND_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("BACKEND_POOL_SIZE", "20"))
+MAX_RETRIES = int(os.getenv("BACKEND_MAX_RETRIES", "2"))
+RETRY_BACKOFF = 0.2
+# Overall time budget for the backend calls a single page issues through gather()
+PAGE_DEADLINE = float(os.getenv("BACKEND_PAGE_DEADLINE", "8"))
+
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {502, 503, 504}
+
+_OBJECT_ID_RE = re.compile(r"/[0-9a-f]{24}(?=/|$)")
+
 
 class BackendClient:
     """Client for communicating with the backend API"""
     
     def __init__(self, base_url: str = BACKEND_URL):
         self.base_url = base_url.rstrip('/')
+        # One keep-alive connection pool shared by every thread of the frontend
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats: Dict[str, Dict] = {}
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="backend")
+        # Per-database copy of the documents list, kept current with /api/docs/changes
+        self._doc_mirrors: Dict[Optional[str], Dict] = {}
+        self._mirror_lock = threading.Lock()
     
     def _make_request(
         self, 
         method: str, 
         endpoint: str, 
         data: Optional[Dict] = None,
-        params: Optional[Dict] = None
+        params: Optional[Dict] = None,
+        retry: Optional[bool] = None
     ) -> Optional[Any]:
-        """Make an HTTP request to the backend API"""
+        """Make an HTTP request to the backend API.
+
+        Idempotent methods (or calls passing retry=True) are retried on
+        connection errors, timeouts and 502/503/504 with jittered backoff.
+        """
         url = f"{self.base_url}{endpoint}"
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                timeout=5
-            )
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (MAX_RETRIES if retry else 0)
+        start = time.perf_counter()
+        result = None
+        ok = False
+        attempt = 0
+        for attempt in range(attempts):
+            if attempt:
+                time.sleep(RETRY_BACKOFF * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            try:
+                response = self.session.request(
+                    method=method,
+                    url=url,
+                    json=data,
+                    params=params,
+                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
+                )
+            except requests.exceptions.RequestException:
+                continue
+            if response.status_code in RETRY_STATUSES:
+                continue
             if response.status_code >= 200 and response.status_code < 300:
-                return response.json()
-            return None
-        except requests.exceptions.RequestException:
-            return None
+                try:
+                    result = response.json()
+                    ok = True
+                except ValueError:
+                    pass
+            break
+        self._record(method, endpoint, time.perf_counter() - start, ok, attempt)
+        return result
+
+    def _record(self, method: str, endpoint: str, elapsed: float, ok: bool, retries: int):
+        key = f"{method.upper()} {_OBJECT_ID_RE.sub('/<id>', endpoint)}"
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            stats = self._stats.setdefault(
+                key, {"count": 0, "errors": 0, "retries": 0, "total_ms": 0.0, "max_ms": 0.0}
+            )
+            stats["count"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["retries"] += retries
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Per-endpoint call counts, errors, retries and latency (ms)"""
+        with self._stats_lock:
+            return {
+                key: dict(stats, avg_ms=stats["total_ms"] / stats["count"])
+                for key, stats in self._stats.items()
+            }
+    
+    def gather(
+        self,
+        calls: Dict[str, Callable[[], Any]],
+        timeout: Optional[float] = PAGE_DEADLINE,
+        defaults: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Run independent backend calls in parallel under one deadline.
+
+        `calls` maps a name to a zero-argument callable, e.g.
+        {"docs": lambda: backend_client.get_documents(db_name=db)}. Returns
+        {name: result}; calls that raise or miss the deadline get the value
+        from `defaults` (None if not given).
+        """
+        defaults = defaults or {}
+        futures = {name: self._executor.submit(fn) for name, fn in calls.items()}
+        wait(futures.values(), timeout=timeout)
+        results = {}
+        for name, future in futures.items():
+            if future.done() and future.exception() is None:
+                results[name] = future.result()
+            else:
+                future.cancel()
+                results[name] = defaults.get(name)
+        return results
+    
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Run fn in the background on the client's worker threads"""
+        return self._executor.submit(fn, *args, **kwargs)
     
     def login_user(self, username_or_email: str, password: str) -> Optional[Dict]:
         """Login a user"""
@@ -54,6 +158,10 @@ class BackendClient:
             data=user_data
         )
     
+    def get_user_profile(self, username: str) -> Optional[Dict]:
+        """Get a user's profile (without password)"""
+        return self._make_request("GET", f"/api/users/{username}/profile")
+
     def get_documents(
         self, 
         category: Optional[str] = None,
@@ -61,6 +169,9 @@ class BackendClient:
         db_name: Optional[str] = None
     ) -> List[Dict]:
         """Get all documents, optionally filtered by category and user_id"""
+        if not category and not user_id:
+            return self.sync_documents(db_name=db_name)
+
         params = {}
         if category:
             params["category"] = category
@@ -72,6 +183,59 @@ class BackendClient:
         result = self._make_request("GET", "/api/docs/", params=params)
         return result if result is not None else []
     
+    def get_document(self, doc_id: str, db_name: Optional[str] = None) -> Optional[Dict]:
+        """Get a single document by ID"""
+        params = {}
+        if db_name:
+            params["db_name"] = db_name
+        
+        return self._make_request("GET", f"/api/docs/{doc_id}", params=params)
+    
+    def get_documents_page(
+        self,
+        offset: int = 0,
+        limit: int = 20,
+        db_name: Optional[str] = None
+    ) -> Optional[List[Dict]]:
+        """Get one page of documents, newest first (None if the backend failed)"""
+        params = {"offset": offset, "limit": limit}
+        if db_name:
+            params["db_name"] = db_name
+        
+        return self._make_request("GET", "/api/docs/", params=params)
+    
+    def sync_documents(self, db_name: Optional[str] = None) -> List[Dict]:
+        """Return all documents, fetching only what changed since the last call.
+
+        The first call loads a full snapshot; later calls apply the deltas from
+        /api/docs/changes to the local mirror. If the backend is unreachable the
+        last known list is returned. Callers get copies, never the mirror's own
+        documents.
+        """
+        with self._mirror_lock:
+            mirror = self._doc_mirrors.setdefault(
+                db_name, {"cursor": 0, "docs": {}, "lock": threading.Lock()}
+            )
+        with mirror["lock"]:
+            params = {"since": mirror["cursor"]}
+            if db_name:
+                params["db_name"] = db_name
+
+            result = self._make_request("GET", "/api/docs/changes", params=params)
+            if result is None:
+                if mirror["cursor"] == 0:
+                    return []
+                return copy.deepcopy(list(mirror["docs"].values()))
+
+            if result.get("full"):
+                mirror["docs"] = {}
+            for doc in result.get("changed", []):
+                mirror["docs"][str(doc.get("_id"))] = doc
+            for doc_id in result.get("deleted", []):
+                mirror["docs"].pop(doc_id, None)
+            mirror["cursor"] = result.get("cursor", mirror["cursor"])
+            return copy.deepcopy(list(mirror["docs"].values()))
+
     def create_document(self, data: Dict, db_name: Optional[str] = None) -> Optional[Dict]:
         """Create a new document"""
         params = {}
@@ -115,6 +279,23 @@ class BackendClient:
             params=params
         )
     
+    def get_dashboard(
+        self,
+        db_name: Optional[str] = None,
+        calendar_start: Optional[str] = None,
+        calendar_end: Optional[str] = None
+    ) -> Optional[Dict]:
+        """Get upcoming approvals and calendar deadlines for the dashboard"""
+        params = {}
+        if db_name:
+            params["db_name"] = db_name
+        if calendar_start:
+            params["calendar_start"] = calendar_start
+        if calendar_end:
+            params["calendar_end"] = calendar_end
+        
+        return self._make_request("GET", "/api/dashboard/", params=params)
+    
     def get_data(self, db_name: Optional[str] = None) -> List[Dict]:
         """Get all data records"""
         params = {}
@@ -137,6 +318,31 @@ class BackendClient:
             params=params
         )
 
+    def batch(self, requests_list: List[Dict], db_name: Optional[str] = None) -> List[Optional[Any]]:
+        """Run several backend reads in one round trip.
+
+        Each entry is {"op": ..., "params": {...}} with op one of docs.list,
+        data.list, users.profile, docs.summary or dashboard.snapshot. Returns
+        one body per entry, in order, with None for entries that failed.
+        """
+        params = {}
+        if db_name:
+            params["db_name"] = db_name
+
+        result = self._make_request(
+            "POST",
+            "/api/batch/",
+            data={"requests": requests_list},
+            params=params,
+            retry=True
+        )
+        if not result:
+            return [None] * len(requests_list)
+        return [
+            r.get("body") if r.get("status") == 200 else None
+            for r in result.get("results", [])
+        ]
+
 
 # Create a singleton instance
 backend_client = BackendClient()
@@ -0,0 +1,107 @@
+import copy
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from flask import g, has_app_context
+
+from .backend_client import backend_client
+
+# Documents younger than this are served without asking the backend
+DOCS_TTL = float(os.getenv("FRONTEND_DOCS_TTL", "30"))
+# Past the TTL, cached documents are still served (and refreshed in the
+# background) up to this age; older entries are refetched before rendering
+DOCS_MAX_STALE = float(os.getenv("FRONTEND_DOCS_MAX_STALE", "300"))
+
+
+class _Entry:
+    def __init__(self):
+        self.value: Optional[List[Dict]] = None
+        self.fetched_at = 0.0
+        self.refreshing = False
+        self.lock = threading.Lock()
+
+
+_entries: Dict[Optional[str], _Entry] = {}
+_entries_lock = threading.Lock()
+
+
+def _entry(db_name: Optional[str]) -> _Entry:
+    with _entries_lock:
+        entry = _entries.get(db_name)
+        if entry is None:
+            entry = _entries[db_name] = _Entry()
+        return entry
+
+
+def _fetch(entry: _Entry, db_name: Optional[str]) -> List[Dict]:
+    docs = backend_client.get_documents(db_name=db_name)
+    entry.value = docs
+    entry.fetched_at = time.monotonic()
+    return docs
+
+
+def _refresh_in_background(entry: _Entry, db_name: Optional[str]):
+    def run():
+        try:
+            with entry.lock:
+                _fetch(entry, db_name)
+        finally:
+            entry.refreshing = False
+
+    with _entries_lock:
+        if entry.refreshing:
+            return
+        entry.refreshing = True
+    backend_client.submit(run)
+
+
+def _cached_documents(db_name: Optional[str]) -> List[Dict]:
+    entry = _entry(db_name)
+    age = time.monotonic() - entry.fetched_at
+    if entry.value is not None and age < DOCS_TTL:
+        return entry.value
+    if entry.value is not None and age < DOCS_MAX_STALE:
+        _refresh_in_background(entry, db_name)
+        return entry.value
+    with entry.lock:
+        # Another thread may have fetched while we waited for the lock
+        if entry.value is not None and time.monotonic() - entry.fetched_at < DOCS_TTL:
+            return entry.value
+        return _fetch(entry, db_name)
+
+
+def get_documents(db_name: Optional[str] = None, category: Optional[str] = None,
+                  user_id: Optional[str] = None) -> List[Dict]:
+    """
+    Documents for a tenant, memoized for the current request and cached
+    across requests. Filters match the backend's exact category/user_id match.
+    Each request gets its own copy, so changing the returned documents
+    never touches the cache.
+    """
+    memo = None
+    if has_app_context():
+        memo = g.setdefault("_documents_memo", {})
+    if memo is not None and db_name in memo:
+        docs = memo[db_name]
+    else:
+        docs = copy.deepcopy(_cached_documents(db_name))
+        if memo is not None:
+            memo[db_name] = docs
+
+    if category:
+        docs = [d for d in docs if d.get("category") == category]
+    if user_id:
+        docs = [d for d in docs if d.get("user_id") == user_id]
+    return docs
+
+
+def invalidate_documents(db_name: Optional[str] = None):
+    """Drop cached documents for a tenant after the frontend changed them."""
+    entry = _entry(db_name)
+    with entry.lock:
+        entry.value = None
+        entry.fetched_at = 0.0
+    if has_app_context():
+        g.get("_documents_memo", {}).pop(db_name, None)
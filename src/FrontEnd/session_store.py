@@ -0,0 +1,211 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+from flask import Flask
+from flask.sessions import SessionInterface, SessionMixin
+from itsdangerous import BadSignature, Signer
+from werkzeug.datastructures import CallbackDict
+
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+SESSIONS_DB = Path(os.getenv("SESSIONS_DB", Path(__file__).parent / "data_storage" / "sessions.db"))
+# Idle seconds before a session expires; each use within the window extends it
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(24 * 3600)))
+MAX_MEMORY_SESSIONS = 10000
+
+
+class MemorySessionStore:
+    """Sessions in this process only, evicted on expiry or least-recent use."""
+
+    def __init__(self, max_sessions: int = MAX_MEMORY_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()  # sid -> (expires_at, data)
+        self._lock = threading.Lock()
+
+    def load(self, sid: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._sessions.get(sid)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._sessions[sid]
+                return None
+            self._sessions.move_to_end(sid)
+            return json.loads(entry[1])
+
+    def save(self, sid: str, data: Dict, ttl: int):
+        with self._lock:
+            self._sessions[sid] = (time.time() + ttl, json.dumps(data))
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid: str):
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+
+class SQLiteSessionStore:
+    """Sessions in SQLite, shared by every worker process using the same file."""
+
+    def __init__(self, path=SESSIONS_DB):
+        self.path = Path(path)
+        self._schema_ready = False
+        self._saves = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    sid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            self._schema_ready = True
+        return conn
+
+    def load(self, sid: str) -> Optional[Dict]:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT data FROM sessions WHERE sid = ? AND expires_at >= ?", (sid, time.time())
+            ).fetchone()
+        finally:
+            conn.close()
+        return json.loads(row[0]) if row else None
+
+    def save(self, sid: str, data: Dict, ttl: int):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (sid, data, expires_at) VALUES (?, ?, ?)",
+                    (sid, json.dumps(data), time.time() + ttl)
+                )
+                self._saves += 1
+                if self._saves % 500 == 0:
+                    conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+        finally:
+            conn.close()
+
+    def delete(self, sid: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+        finally:
+            conn.close()
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid: Optional[str] = None, new: bool = False, expires_at: float = 0):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid or secrets.token_urlsafe(32)
+        self.new = new
+        self.expires_at = expires_at
+        self.modified = False
+        self.previous_sid: Optional[str] = None
+
+    def regenerate(self):
+        """Move the session to a new id, e.g. on login, so an old cookie cannot be reused."""
+        if self.previous_sid is None and not self.new:
+            self.previous_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Keeps session data in a store and only a signed session id in the cookie.
+    Unchanged sessions are written back only once half their TTL has passed,
+    so most requests read the store without writing to it.
+    """
+
+    def __init__(self, store, ttl: int = SESSION_TTL):
+        self.store = store
+        self.ttl = ttl
+
+    def _signer(self, app: Flask) -> Optional[Signer]:
+        if not app.secret_key:
+            return None
+        return Signer(app.secret_key, salt="session-id")
+
+    def _sid_from_cookie(self, app: Flask, cookie_value: str) -> Optional[str]:
+        signer = self._signer(app)
+        if signer is None or not cookie_value:
+            return None
+        try:
+            return signer.unsign(cookie_value).decode("utf-8")
+        except BadSignature:
+            return None
+
+    def read(self, app: Flask, cookie_value: str) -> Optional[Dict]:
+        """Session data for a raw cookie value, for servers outside the Flask request cycle."""
+        sid = self._sid_from_cookie(app, cookie_value)
+        return self.store.load(sid) if sid else None
+
+    def open_session(self, app, request):
+        sid = self._sid_from_cookie(app, request.cookies.get(self.get_cookie_name(app), ""))
+        if sid:
+            data = self.store.load(sid)
+            if data is not None:
+                return ServerSideSession(data.get("values"), sid=sid, expires_at=data.get("expires_at", 0))
+        return ServerSideSession(new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.previous_sid:
+            self.store.delete(session.previous_sid)
+
+        if not session:
+            if not session.new:
+                self.store.delete(session.sid)
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        now = time.time()
+        refresh = session.expires_at - now < self.ttl / 2
+        if not (session.modified or refresh):
+            return
+
+        expires_at = now + self.ttl
+        self.store.save(session.sid, {"values": dict(session), "expires_at": expires_at}, self.ttl)
+        response.set_cookie(
+            name,
+            self._signer(app).sign(session.sid).decode("utf-8"),
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+        response.vary.add("Cookie")
+
+
+def init_session_store(app: Flask, kind: str = SESSION_STORE) -> ServerSideSessionInterface:
+    """Use server-side sessions for `app`, stored in SQLite (default) or memory."""
+    if kind == "memory":
+        store = MemorySessionStore()
+    elif kind == "sqlite":
+        store = SQLiteSessionStore()
+    else:
+        raise ValueError(f"Unknown session store: {kind}")
+    app.session_interface = ServerSideSessionInterface(store)
+    return app.session_interface
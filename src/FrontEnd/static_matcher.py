@@ -0,0 +1,104 @@
+from collections import deque
+from functools import lru_cache
+
+
+class StaticItemMatcher:
+    """
+    Maps a document's title/name to one of a section's static item titles.
+
+    Same rules as the original scan in get_category_items: an exact title
+    match wins, then an exact name match, then the first static title (in
+    list order) that contains, or is contained in, the document title or
+    name. Containment is answered from indexes built once per title list:
+    an Aho-Corasick automaton finds static titles inside document text, and
+    a table of every substring of every static title answers the reverse.
+    """
+
+    def __init__(self, titles):
+        self.titles = list(titles)
+        self._exact = {}
+        for i, title in enumerate(self.titles):
+            self._exact.setdefault(title, i)
+
+        # substring of some static title -> lowest index of a title containing it
+        self._contained_in = {}
+        for i, title in enumerate(self.titles):
+            for start in range(len(title) + 1):
+                for end in range(start, len(title) + 1):
+                    self._contained_in.setdefault(title[start:end], i)
+
+        self._build_automaton()
+        self.match = lru_cache(maxsize=4096)(self._match)
+
+    def _build_automaton(self):
+        goto = [{}]
+        outputs = [set()]
+        for i, title in enumerate(self.titles):
+            state = 0
+            for ch in title:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append(set())
+                state = nxt
+            outputs[state].add(i)
+
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+                outputs[nxt] |= outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+
+    def _titles_in(self, text):
+        """Indexes of static titles occurring in `text`."""
+        # outputs[0] holds the empty title, if any, which occurs everywhere
+        found = set(self._outputs[0])
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+    def _best(self, text):
+        candidates = self._titles_in(text)
+        contained = self._contained_in.get(text)
+        if contained is not None:
+            candidates.add(contained)
+        return min(candidates) if candidates else None
+
+    def _match(self, doc_title, doc_name):
+        """Return the matching static title, or None."""
+        if doc_title in self._exact:
+            return doc_title
+        if doc_name in self._exact:
+            return doc_name
+        best = [i for i in (self._best(doc_title), self._best(doc_name)) if i is not None]
+        return self.titles[min(best)] if best else None
+
+
+_matchers = {}
+
+
+def get_matcher(titles):
+    """Return the matcher for a list of static titles, building it once."""
+    key = tuple(titles)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = StaticItemMatcher(key)
+    return matcher
@@ -0,0 +1,154 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.Monitoring import Counter, CallbackGauge
+
+ANALYSIS_CACHE_DB = Path(os.getenv("ANALYSIS_CACHE_DB", Path(__file__).parent / "analysis_cache.db"))
+# Total size of cached results; least recently used entries are evicted past it
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# Set ANALYSIS_CACHE=0 to always call the model
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE", "1") != "0"
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so re-extracted copies of a document hash the same."""
+    return " ".join(text.split())
+
+
+class AnalysisCache:
+    """
+    LLM results in SQLite, keyed by a hash of the normalized document text,
+    the prompt version and the model, so any change to either misses.
+    """
+
+    def __init__(self, path=ANALYSIS_CACHE_DB, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+                 enabled: bool = ANALYSIS_CACHE_ENABLED):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._schema_ready = False
+        self._lock = threading.Lock()
+        self.lookups = Counter(
+            "analysis_cache_lookups_total", "Document analysis cache lookups by result.", ("result",))
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analyses (
+                    key TEXT PRIMARY KEY,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_analyses_last_used ON analyses (last_used)")
+            self._schema_ready = True
+        return conn
+
+    @staticmethod
+    def key(text: str, prompt_version: str, model: str) -> str:
+        digest = hashlib.sha256()
+        for part in (prompt_version, model, normalize_text(text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        self.lookups.inc(result="hit" if hit else "miss")
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    row = conn.execute("SELECT result FROM analyses WHERE key = ?", (key,)).fetchone()
+                    if row:
+                        conn.execute("UPDATE analyses SET last_used = ? WHERE key = ?", (time.time(), key))
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[WARN] Analysis cache read failed: {e}")
+            row = None
+        self._count(row is not None)
+        return row[0] if row else None
+
+    def put(self, key: str, result: str):
+        if not self.enabled or not result:
+            return
+        size = len(result.encode("utf-8"))
+        now = time.time()
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO analyses (key, result, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                        (key, result, size, now, now)
+                    )
+                    self._evict(conn)
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"[WARN] Analysis cache write failed: {e}")
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT IFNULL(SUM(size), 0) FROM analyses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% so the next few writes don't each evict again
+        excess = total - int(self.max_bytes * 0.9)
+        for key, size in conn.execute("SELECT key, size FROM analyses ORDER BY last_used").fetchall():
+            if excess <= 0:
+                break
+            conn.execute("DELETE FROM analyses WHERE key = ?", (key,))
+            excess -= size
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def size_bytes(self) -> int:
+        try:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT IFNULL(SUM(size), 0) FROM analyses").fetchone()[0]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    def stats(self) -> Dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate(), 3),
+            "size_bytes": self.size_bytes(),
+        }
+
+    def metrics(self) -> list:
+        """Metrics to add to the app's MetricsRegistry."""
+        return [
+            self.lookups,
+            CallbackGauge("analysis_cache_hit_rate", "Share of document analyses served from the cache.", self.hit_rate),
+            CallbackGauge("analysis_cache_bytes", "Size of cached document analyses.", self.size_bytes),
+        ]
+
+
+analysis_cache = AnalysisCache()
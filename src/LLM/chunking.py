@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Sequence, TypeVar
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Most document tokens sent in one prompt; longer texts are split into chunks
+CHUNK_TOKENS = int(os.getenv("LLM_CHUNK_TOKENS", "12000"))
+# Chunks analyzed at the same time
+MAP_WORKERS = int(os.getenv("LLM_MAP_WORKERS", "4"))
+# Characters per token when tiktoken isn't installed (a little low, so chunks stay under budget)
+CHARS_PER_TOKEN = 3
+
+# Blank lines separate most sections; chunks break there first, then at lines
+_BREAK_RE = re.compile(r"\n\s*\n")
+# Chunks join their blocks with this; it counts against the budget too
+_SEPARATOR = "\n\n"
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """
+    The tiktoken encoding, loaded on first use rather than at import: the
+    first load may download the BPE file, which fails or hangs offline.
+    None (estimate from length) if it can't be loaded.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                if tiktoken is not None:
+                    try:
+                        _encoding = tiktoken.get_encoding("o200k_base")
+                    except Exception as e:
+                        print(f"[WARN] tiktoken encoding unavailable, estimating tokens from length: {e}")
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _blocks(text: str, max_tokens: int) -> Iterator[str]:
+    """Pages and sections; ones longer than a chunk are cut at lines, then at a fixed size."""
+    for section in _BREAK_RE.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        if count_tokens(section) <= max_tokens:
+            yield section
+            continue
+        for line in section.split("\n"):
+            if count_tokens(line) <= max_tokens:
+                yield line
+                continue
+            size = max_tokens * CHARS_PER_TOKEN
+            for start in range(0, len(line), size):
+                yield line[start:start + size]
+
+
+def split_text(text: str, max_tokens: int = CHUNK_TOKENS) -> List[str]:
+    """
+    Split text into chunks of at most max_tokens, packing whole pages and
+    sections together and only cutting inside one that is itself too long.
+    """
+    if count_tokens(text) <= max_tokens:
+        return [text]
+    separator_tokens = count_tokens(_SEPARATOR)
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+    for block in _blocks(text, max_tokens):
+        tokens = count_tokens(block) + (separator_tokens if current else 0)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append(_SEPARATOR.join(current))
+            current, current_tokens = [], 0
+            tokens -= separator_tokens
+        current.append(block)
+        current_tokens += tokens
+    if current:
+        chunks.append(_SEPARATOR.join(current))
+    return chunks
+
+
+def map_chunks(fn: Callable[[T], R], chunks: Sequence[T]) -> List[R]:
+    """fn over every chunk on up to MAP_WORKERS threads; results in chunk order."""
+    if len(chunks) == 1:
+        return [fn(chunks[0])]
+    with ThreadPoolExecutor(max_workers=min(MAP_WORKERS, len(chunks)), thread_name_prefix="llm-map") as pool:
+        return list(pool.map(fn, chunks))
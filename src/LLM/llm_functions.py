@@ -1,4 +1,3 @@
-import PyPDF2
 import openai
 import os
 import re
@@ -7,6 +6,17 @@ from dotenv import load_dotenv
 from textwrap import dedent
 import fitz
 import json
+import sys
+from difflib import unified_diff
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Optional
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.LLM.analysis_cache import analysis_cache
+from src.LLM.chunking import CHUNK_TOKENS, count_tokens, map_chunks, split_text
+from src.LLM.pdf_cache import pdf_cache
 
 _ = load_dotenv()
 
@@ -15,16 +25,44 @@ client = openai.OpenAI(
     base_url="https://fj7qg3jbr3.execute-api.eu-west-1.amazonaws.com/v1"
 )
 
+ANALYZER_MODEL = "gpt-5-nano"
+# Most document characters put into a single prompt; the rest of a long document is not read
+TEXT_BUDGET_CHARS = int(os.getenv("LLM_TEXT_BUDGET_CHARS", "200000"))
+# Bump when the document_analyzer prompt changes so cached analyses are not reused
+ANALYZER_PROMPT_VERSION = "1"
+
 
 # functions
-def clean_text(text: str) -> str:
-    """Remove control characters and normalize spacing so the gateway doesn't error."""
+def _clean(text: str) -> str:
     text = unicodedata.normalize("NFKC", text)
     text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]", " ", text)  # remove control chars
     text = re.sub(r"[ \t\u00A0]+", " ", text)
     text = re.sub(r"\n{3,}", "\n\n", text)
-    text = text.encode("utf-8", "ignore").decode("utf-8", "ignore")
-    return text.strip()
+    return text.encode("utf-8", "ignore").decode("utf-8", "ignore")
+
+
+def clean_text(text: str) -> str:
+    """Remove control characters and normalize spacing so the gateway doesn't error."""
+    return _clean(text).strip()
+
+
+def clean_pages(pages) -> Iterator[str]:
+    """
+    clean_text("\n".join(pages)) one page at a time: the pieces join to
+    exactly that text. Whitespace at the end of a page is held back until
+    the next page shows whether it is trailing or has to merge with it.
+    """
+    pending = ""
+    started = False
+    for number, page in enumerate(pages):
+        text = _clean(pending + ("\n" if number else "") + page)
+        body = text.rstrip()
+        pending = text[len(body):]
+        if not started:
+            body = body.lstrip()
+            started = bool(body)
+        if body:
+            yield body
 
 
 # takes as input a file (either pdf or text file?)
@@ -33,8 +71,25 @@ def clean_text(text: str) -> str:
 # * deadlines & obligations
 # * EFFECT: save key fields and deadlines & obligations to the database
 def document_analyzer(file_to_analyze):
-    text = read_text(file_to_analyze)  # ← this converts the PDF to UTF-8 text
+    text = read_text(file_to_analyze, max_chars=TEXT_BUDGET_CHARS)  # ← this converts the PDF to UTF-8 text
+
+    # The same text, prompt and model give the same analysis: reuse it
+    cache_key = analysis_cache.key(text, ANALYZER_PROMPT_VERSION, ANALYZER_MODEL)
+    cached = analysis_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Long documents are analyzed chunk by chunk in parallel and merged
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        result = _analyze_text(text)
+    else:
+        result = _merge_analyses(map_chunks(_analyze_text, chunks))
+    analysis_cache.put(cache_key, result)
+    return result
 
+
+def _analyze_text(text):
     prompt = prompt = f"""\
     You are a disciplined back-office assistant. Follow the output format EXACTLY. Be literal; do not guess. If a value is missing in the document, return null. Dates must be YYYY-MM-DD (assume Europe/Amsterdam naming if month names appear).
 
@@ -102,7 +157,7 @@ def document_analyzer(file_to_analyze):
     """
 
     response = client.chat.completions.create(
-        model="gpt-5-nano",
+        model=ANALYZER_MODEL,
         messages=[
             {"role": "system",
              "content": "You are a disciplined back-office assistant. Follow the output format EXACTLY. Be literal; do not guess. If a value is missing in the document, return null. Dates must be YYYY-MM-DD (assume Europe/Amsterdam naming if month names appear)."},
@@ -114,25 +169,91 @@ def document_analyzer(file_to_analyze):
     return response.choices[0].message.content
 
 
-def read_text(path: str):
+def parse_json_reply(reply):
+    """The JSON object in a model reply, which may be wrapped in a code fence."""
+    match = re.search(r"\{.*\}", reply or "", re.DOTALL)
+    if not match:
+        return None
+    try:
+        return json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return None
+
+
+def _merge_analyses(replies):
+    """
+    Merge per-chunk document_analyzer replies into one, deterministically:
+    the most common category (earliest chunk on a tie) and its first name,
+    the first date_received found, and every distinct deadline by date.
+    """
+    analyses = [a for a in (parse_json_reply(r) for r in replies) if isinstance(a, dict)]
+    if not analyses:
+        return replies[0]
+
+    categories = [a["category"] for a in analyses if a.get("category")]
+    category = max(categories, key=lambda c: (categories.count(c), -categories.index(c))) if categories else None
+    name = next((a["name"] for a in analyses if a.get("category") == category and a.get("name")), None)
+    date_received = next(
+        (a["date_received"] for a in analyses if a.get("date_received") not in (None, "", "null")), None
+    )
+
+    deadlines = {}
+    for analysis in analyses:
+        for deadline in analysis.get("deadlines") or []:
+            if isinstance(deadline, dict):
+                deadline = [deadline.get("date"), deadline.get("description"), deadline.get("recurrence")]
+            if not isinstance(deadline, list) or len(deadline) != 3 or not deadline[0]:
+                continue
+            key = (deadline[0], str(deadline[1] or "").strip().lower())
+            deadlines.setdefault(key, deadline)
+
+    merged = {
+        "category": category,
+        "name": name,
+        "date_received": date_received,
+        "deadlines": [deadlines[key] for key in sorted(deadlines)],
+    }
+    # Same shape as a single reply, so callers parse it the same way
+    return "```json\n" + json.dumps(merged, ensure_ascii=False, indent=4) + "\n```"
+
+
+def iter_text(path: str, max_chars: Optional[int] = None, max_pages: Optional[int] = None) -> Iterator[str]:
+    """
+    Yield the text of `path` piece by piece (cleaned pages for a PDF, raw
+    chunks for a text file), stopping once max_chars characters or
+    max_pages pages have been read. Only the current page is in memory.
+    """
+    if path.lower().endswith(".pdf"):
+        pieces = clean_pages(islice(pdf_cache.iter_pages(path), max_pages))
+    else:
+        def read_chunks():
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                yield from iter(lambda: f.read(65536), "")
+        pieces = islice(read_chunks(), max_pages)
+
+    remaining = max_chars
+    for piece in pieces:
+        if remaining is not None:
+            piece = piece[:remaining]
+            remaining -= len(piece)
+        yield piece
+        if remaining is not None and remaining <= 0:
+            break
+
+
+def read_text(path: str, max_chars: Optional[int] = None, max_pages: Optional[int] = None):
     if path.lower().endswith(".pdf"):
         try:
-            pages = []
-            with open(path, "rb") as f:
-                r = PyPDF2.PdfReader(f)
-                for p in r.pages:
-                    pages.append(p.extract_text() or "")
-            return clean_text("\n".join(pages))  # i need this to be utf-8
+            return "".join(iter_text(path, max_chars, max_pages))  # i need this to be utf-8
         except Exception:
             raise RuntimeError("PDF read failed. ")
     else:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
+        return "".join(iter_text(path, max_chars, max_pages))
 
 
 # form filler (existing)
 def fill_in_form(file_to_fill_in):
-    text = read_text(file_to_fill_in)
+    text = read_text(file_to_fill_in, max_chars=TEXT_BUDGET_CHARS)
 
     fields_in_the_database = getFieldsFromTheDatabase()
     prompt_to_identify_missing = f'''You are given a document. In this document, some spots are not filled, for example it might have something like: Name: .... or Name: and then nothing. You should identify these, and output a list of them. The answer should be in this format: [field1, field2, field3, ...].
@@ -215,9 +336,26 @@ def getFieldsFromTheDatabase(): ### ---------------- need to do
 
 
 def find_difference(file1, file2):
-    text1 = read_text(file1)
-    text2 = read_text(file2)
-
+    text1 = read_text(file1, max_chars=TEXT_BUDGET_CHARS // 2)
+    text2 = read_text(file2, max_chars=TEXT_BUDGET_CHARS // 2)
+
+    if count_tokens(text1) + count_tokens(text2) <= CHUNK_TOKENS:
+        return _compare_texts((text1, text2))
+
+    # Long contracts: diff the lines locally and send only the changed hunks,
+    # so an inserted clause doesn't shift everything after it out of line
+    diff = "\n".join(unified_diff(text1.splitlines(), text2.splitlines(), "OLD", "NEW", n=2, lineterm=""))
+    if not diff:
+        return "No differences found."
+    parts = split_text(diff, CHUNK_TOKENS)
+    overviews = map_chunks(_compare_diff, parts)
+    if len(parts) == 1:
+        return overviews[0]
+    return "\n\n".join(f"Part {i} of {len(parts)}:\n{overview.strip()}" for i, overview in enumerate(overviews, 1))
+
+
+def _compare_texts(texts):
+    text1, text2 = texts
     prompt = f"""\
     You are a contract comparer. Compare FILE_OLD (previous year) vs FILE_NEW (this year).
     Return a SHORT, human-friendly overview of the most important differences.
@@ -239,6 +377,28 @@ def find_difference(file1, file2):
     return response.choices[0].message.content
 
 
+def _compare_diff(diff):
+    prompt = f"""\
+    You are a contract comparer. Below are the changes from FILE_OLD (previous year) to FILE_NEW (this year)
+    as a unified diff: lines starting with "-" were removed, lines starting with "+" were added, other lines
+    are unchanged context.
+    Return a SHORT, human-friendly overview of the most important differences.
+
+    {diff}
+    """
+
+    response = client.chat.completions.create(
+        model="gpt-5-nano",
+        messages=[
+            {"role": "system", "content": "You are a contract comparer."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=1
+    )
+
+    return response.choices[0].message.content
+
+
 def create_reminder():
     pass
 
@@ -248,6 +408,18 @@ def send_reminder():
 
 def get_fields_to_fill_pdf(text, db):
     """Use GPT-5 to detect blanks and map them to database fields."""
+    chunks = split_text(text)
+    if len(chunks) == 1:
+        return _fields_to_fill(text, db)
+    fields = {}
+    # Chunks come back in document order; the first value found for a field wins
+    for chunk_fields in map_chunks(lambda chunk: _fields_to_fill(chunk, db), chunks):
+        for field, value in chunk_fields.items():
+            fields.setdefault(field, value)
+    return fields
+
+
+def _fields_to_fill(text, db):
     prompt = f"""
     You are a smart PDF form filler assistant.
     The document text includes blanks such as 'Name: ____' or 'Email: ____'.
@@ -274,45 +446,39 @@ def get_fields_to_fill_pdf(text, db):
     )
 
     try:
-        return json.loads(response.choices[0].message.content)
+        fields = json.loads(response.choices[0].message.content)
     except Exception:
         print("⚠️ GPT JSON parse failed.")
         return {}
+    return fields if isinstance(fields, dict) else {}
 
 
 def get_pdf_form_fields(pdf_path):
     """Return AcroForm fields if present using PyMuPDF with enhanced detection."""
     try:
-        doc = fitz.open(pdf_path)
         fields = {}
 
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            widgets = page.widgets()
-
-            if widgets:
-                for widget in widgets:
-                    # Try multiple ways to get the field name
-                    field_name = widget.field_name
-
-                    # Fallback: use field_label if field_name is empty
-                    if not field_name:
-                        field_name = widget.field_label
-
-                    # Fallback: generate name from position
-                    if not field_name:
-                        field_name = f"field_{page_num}_{widget.rect.x0}_{widget.rect.y0}"
-
-                    if field_name:
-                        fields[field_name] = {
-                            'type': widget.field_type,
-                            'rect': widget.rect,
-                            'page': page_num,
-                            'value': widget.field_value
-                        }
-                        print(f"✅ Found field: {field_name} (type: {widget.field_type})")
+        for widget in pdf_cache.get(pdf_path).widgets:
+            rect = fitz.Rect(widget['rect'])
+            # Try multiple ways to get the field name
+            field_name = widget['name']
 
-        doc.close()
+            # Fallback: use field_label if field_name is empty
+            if not field_name:
+                field_name = widget['label']
+
+            # Fallback: generate name from position
+            if not field_name:
+                field_name = f"field_{widget['page']}_{rect.x0}_{rect.y0}"
+
+            if field_name:
+                fields[field_name] = {
+                    'type': widget['type'],
+                    'rect': rect,
+                    'page': widget['page'],
+                    'value': widget['value']
+                }
+                print(f"✅ Found field: {field_name} (type: {widget['type']})")
 
         if not fields:
             print("⚠️ No form fields detected. This may be a static PDF or use a different form technology.")
@@ -356,29 +522,18 @@ def diagnose_pdf_structure(pdf_path):
 def fill_pdf_form(input_pdf, output_pdf, data):
     """Fill a fillable (AcroForm) PDF using PyMuPDF with intelligent field mapping."""
     try:
-        doc = fitz.open(input_pdf)
-
-        # First pass: collect field info for GPT mapping
+        # First pass: collect field info for GPT mapping from the cached extraction
         field_info = {}
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-
-            for widget in page.widgets():
-                field_name = widget.field_name or widget.field_label
-                if field_name:
-                    rect = widget.rect
-                    nearby_text = page.get_text("text", clip=fitz.Rect(
-                        rect.x0 - 100, rect.y0 - 20,
-                        rect.x0, rect.y1 + 20
-                    ))
-                    field_info[field_name] = {
-                        'context': nearby_text.strip(),
-                        'page': page_num  # Store only page number, not widget
-                    }
+        for widget in pdf_cache.get(input_pdf).widgets:
+            field_name = widget['name'] or widget['label']
+            if field_name:
+                field_info[field_name] = {
+                    'context': widget['context'],
+                    'page': widget['page']
+                }
 
         if not field_info:
             print("⚠️ No fillable fields found")
-            doc.close()
             return
 
         # Use GPT to map fields
@@ -413,10 +568,10 @@ If a PDF field has no good match, omit it from the mapping.
             print(f"📋 Field mapping: {field_mapping}")
         except:
             print("⚠️ Failed to parse field mapping")
-            doc.close()
             return
 
-        # Second pass: fill fields using the mapping
+        # Second pass: fill fields using the mapping (writing needs the document itself)
+        doc = fitz.open(input_pdf)
         filled_count = 0
         for page_num in range(len(doc)):
             page = doc[page_num]
@@ -457,7 +612,7 @@ def fill_in_form_pdf(file_to_fill_in):
     using GPT-5 for reasoning + coordinate estimation.
     """
     db = getFieldsFromTheDatabase()
-    text = read_text(file_to_fill_in)
+    text = read_text(file_to_fill_in, max_chars=TEXT_BUDGET_CHARS)
 
     print("🤖 Using GPT-5 to detect and match fields...")
     field_data = get_fields_to_fill_pdf(text, db)
@@ -0,0 +1,253 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import fitz
+import PyPDF2
+
+# Extractions kept in memory; older files are dropped first
+PDF_CACHE_MAX_FILES = int(os.getenv("PDF_CACHE_MAX_FILES", "32"))
+# Processes extracting page ranges of large PDFs in parallel (1 = in-process only)
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Smaller PDFs are extracted in-process; starting work in other processes costs more than it saves
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+# Longer PDFs are streamed page by page instead of being held in the cache
+PDF_CACHE_MAX_PAGES = int(os.getenv("PDF_CACHE_MAX_PAGES", "100"))
+# Pages per range when streaming through the process pool
+STREAM_RANGE_PAGES = 8
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+class PdfExtraction:
+    """Everything the LLM functions read from one PDF."""
+
+    def __init__(self, pages: List[str], widgets: List[Dict], page_times: List[float], engine: str):
+        self.pages = pages
+        self.widgets = widgets
+        # Seconds spent extracting each page's text
+        self.page_times = page_times
+        self.engine = engine
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the backend calls this from worker threads
+            _pool = ProcessPoolExecutor(PDF_EXTRACT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor):
+    """Drop a pool whose worker died, so the next call starts a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _read_pages(doc, start: int, stop: int) -> List[Tuple[str, float]]:
+    results = []
+    for page_num in range(start, stop):
+        started = time.perf_counter()
+        text = doc[page_num].get_text() or ""
+        results.append((text, time.perf_counter() - started))
+    return results
+
+
+def _extract_range(path: str, start: int, stop: int) -> List[Tuple[str, float]]:
+    """(text, seconds) for pages start..stop-1; runs in a pool process."""
+    with fitz.open(path) as doc:
+        return _read_pages(doc, start, stop)
+
+
+def _page_ranges(page_count: int, size: int) -> List[Tuple[int, int]]:
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _extract_pages(path: str, doc) -> List[Tuple[str, float]]:
+    """Pages of the open `doc`; large files are read in page ranges on the process pool."""
+    page_count = doc.page_count
+    if PDF_EXTRACT_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+        pool = None
+        try:
+            pool = _get_pool()
+            # Two ranges per worker so one slow range doesn't leave the others idle
+            ranges = _page_ranges(page_count, -(-page_count // (PDF_EXTRACT_WORKERS * 2)))
+            futures = [pool.submit(_extract_range, path, start, stop) for start, stop in ranges]
+            return [page for future in futures for page in future.result()]
+        except Exception as e:
+            if pool is not None and isinstance(e, BrokenProcessPool):
+                _discard_pool(pool)
+            print(f"[WARN] Parallel PDF extraction failed, extracting in-process: {e}")
+    return _read_pages(doc, 0, page_count)
+
+
+def _extract_widgets(doc) -> List[Dict]:
+    widgets = []
+    if not doc.is_form_pdf:
+        return widgets
+    for page_num, page in enumerate(doc):
+        for widget in page.widgets() or []:
+            rect = widget.rect
+            # Text just left of the field, used to tell the model what it is for
+            context = page.get_text("text", clip=fitz.Rect(rect.x0 - 100, rect.y0 - 20, rect.x0, rect.y1 + 20))
+            widgets.append({
+                "name": widget.field_name,
+                "label": widget.field_label,
+                "type": widget.field_type,
+                "rect": tuple(rect),
+                "page": page_num,
+                "value": widget.field_value,
+                "context": context.strip(),
+            })
+    return widgets
+
+
+def _stream_pages(path: str, page_count: int) -> Iterator[str]:
+    """
+    Page texts in order without keeping the document's text around. Large
+    files go through the process pool with at most one range per worker in
+    flight; if the pool fails, the rest is read in-process.
+    """
+    yielded = 0
+    if PDF_EXTRACT_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+        ranges = iter(_page_ranges(page_count, STREAM_RANGE_PAGES))
+        pending = deque()
+        pool = None
+        try:
+            pool = _get_pool()
+            for start, stop in ranges:
+                pending.append(pool.submit(_extract_range, path, start, stop))
+                if len(pending) == PDF_EXTRACT_WORKERS:
+                    break
+            while pending:
+                pages = pending.popleft().result()
+                next_range = next(ranges, None)
+                if next_range:
+                    pending.append(pool.submit(_extract_range, path, *next_range))
+                for text, _ in pages:
+                    yield text
+                    yielded += 1
+            return
+        except Exception as e:
+            if pool is not None and isinstance(e, BrokenProcessPool):
+                _discard_pool(pool)
+            print(f"[WARN] Parallel PDF extraction failed, extracting in-process: {e}")
+        finally:
+            # Also runs when the consumer stops early: drop ranges not started yet
+            for future in pending:
+                future.cancel()
+    with fitz.open(path) as doc:
+        for page_num in range(yielded, page_count):
+            yield doc[page_num].get_text() or ""
+
+
+def _extract_pypdf2(path: str) -> PdfExtraction:
+    pages = []
+    page_times = []
+    with open(path, "rb") as f:
+        for page in PyPDF2.PdfReader(f).pages:
+            started = time.perf_counter()
+            pages.append(page.extract_text() or "")
+            page_times.append(time.perf_counter() - started)
+    return PdfExtraction(pages, [], page_times, "pypdf2")
+
+
+def _extract(path: str) -> PdfExtraction:
+    """
+    Extract with PyMuPDF, splitting large PDFs into page ranges on a process
+    pool. Falls back to PyPDF2 (text only, no widgets) if PyMuPDF fails.
+    """
+    try:
+        with fitz.open(path) as doc:
+            widgets = _extract_widgets(doc)
+            pages = _extract_pages(path, doc)
+        return PdfExtraction([text for text, _ in pages], widgets, [seconds for _, seconds in pages], "pymupdf")
+    except Exception as e:
+        print(f"[WARN] PyMuPDF could not read {path}, falling back to PyPDF2: {e}")
+        return _extract_pypdf2(path)
+
+
+class PdfExtractionCache:
+    """
+    Parsed PDFs keyed by path, mtime and size, so a file read by several
+    LLM functions in one pipeline run is parsed once. A changed file has a
+    new mtime or size and is parsed again.
+    """
+
+    def __init__(self, extract: Callable[[str], PdfExtraction] = _extract, max_files: int = PDF_CACHE_MAX_FILES):
+        self.extract = extract
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # path -> (signature, extraction)
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> PdfExtraction:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            path_lock = self._path_locks.setdefault(path, threading.Lock())
+        # Concurrent readers of the same file wait for one parse
+        with path_lock:
+            extraction = self._lookup(path, signature)
+            if extraction is not None:
+                return extraction
+            extraction = self.extract(path)
+            with self._lock:
+                self.misses += 1
+                self._entries[path] = (signature, extraction)
+                self._entries.move_to_end(path)
+                while len(self._entries) > self.max_files:
+                    evicted, _ = self._entries.popitem(last=False)
+                    self._path_locks.pop(evicted, None)
+            return extraction
+
+    def iter_pages(self, path: str) -> Iterator[str]:
+        """
+        Page texts one at a time. PDFs up to PDF_CACHE_MAX_PAGES come from
+        the cached extraction; longer ones are streamed from the file and not
+        cached, so memory stays proportional to a few pages.
+        """
+        abspath = os.path.abspath(path)
+        stat = os.stat(abspath)
+        extraction = self._lookup(abspath, (stat.st_mtime_ns, stat.st_size))
+        if extraction is None:
+            try:
+                with fitz.open(abspath) as doc:
+                    page_count = doc.page_count
+            except Exception:
+                page_count = None
+            if page_count is not None and page_count > PDF_CACHE_MAX_PAGES:
+                yield from _stream_pages(abspath, page_count)
+                return
+            extraction = self.get(abspath)
+        yield from extraction.pages
+
+    def _lookup(self, path: str, signature: tuple) -> Optional[PdfExtraction]:
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != signature:
+                return None
+            self.hits += 1
+            self._entries.move_to_end(path)
+            return entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._path_locks.clear()
+
+
+pdf_cache = PdfExtractionCache()
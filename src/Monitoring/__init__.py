@@ -0,0 +1,3 @@
+from .metrics import init_metrics, MetricsRegistry, Counter, Gauge, CallbackGauge, Histogram
+
+__all__ = ['init_metrics', 'MetricsRegistry', 'Counter', 'Gauge', 'CallbackGauge', 'Histogram']
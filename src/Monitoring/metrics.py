@@ -0,0 +1,230 @@
+import hmac
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import Flask, Response, g, request
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Tenants come from request data, so cap how many distinct label values we keep.
+MAX_TENANTS = 100
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bearer token required to read /metrics; without one it is only served to
+# localhost clients that did not come through a proxy
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+_LOCAL_ADDRS = {"127.0.0.1", "::1"}
+# A proxy on the same host connects from localhost, so these mark a remote client
+_PROXY_HEADERS = ("X-Forwarded-For", "X-Forwarded-Host", "X-Forwarded-Proto", "X-Real-IP", "Forwarded")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: Optional[Dict] = None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    for n, v in (extra or {}).items():
+        pairs.append(f'{n}="{_escape(v)}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for suffix, key, extra, value in self._samples():
+                labels = _format_labels(self.labelnames, key, extra)
+                lines.append(f"{self.name}{suffix}{labels} {_format_number(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        for key, value in self._values.items():
+            yield "", key, None, value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class CallbackGauge(_Metric):
+    """Gauge whose value is read from `fn` each time metrics are rendered."""
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, fn: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.fn = fn
+
+    def _samples(self):
+        yield "", (), None, self.fn()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def _samples(self):
+        for key, (counts, total, count) in self._values.items():
+            for bound, bucket_count in zip(self.buckets, counts):
+                yield "_bucket", key, {"le": _format_number(bound)}, bucket_count
+            yield "_sum", key, None, total
+            yield "_count", key, None, count
+
+
+class MetricsRegistry:
+    """
+    Per-app request metrics, rendered in Prometheus text format.
+
+    Values live in this process only. Behind a multi-process server each
+    worker reports its own share, so run one worker process (scale with
+    threads) or scrape every worker separately.
+    """
+
+    def __init__(self):
+        labels = ("method", "endpoint", "tenant")
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Request latency in seconds.", labels)
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size in bytes.", labels, buckets=SIZE_BUCKETS)
+        self.requests = Counter(
+            "http_requests_total", "Finished requests by status code.", labels + ("status",))
+        self.in_flight = Gauge(
+            "http_requests_in_flight", "Requests currently being served.")
+        self.exceptions = Counter(
+            "http_request_exceptions_total", "Unhandled exceptions raised by views.", ("endpoint", "exception"))
+        self._metrics = [self.request_duration, self.response_size, self.requests, self.in_flight, self.exceptions]
+        self._tenants = set()
+        self._tenants_lock = threading.Lock()
+
+    def tenant_label(self, tenant: Optional[str]) -> str:
+        if not tenant:
+            return "none"
+        with self._tenants_lock:
+            if tenant in self._tenants:
+                return tenant
+            if len(self._tenants) < MAX_TENANTS:
+                self._tenants.add(tenant)
+                return tenant
+        return "other"
+
+    def register(self, *metrics: _Metric):
+        """Add metrics owned by other components to this app's /metrics output."""
+        self._metrics.extend(metrics)
+
+    def render(self) -> str:
+        return "\n".join(m.render() for m in self._metrics) + "\n"
+
+
+def init_metrics(app: Flask, tenant_getter: Callable[[], Optional[str]], path: str = "/metrics") -> MetricsRegistry:
+    """Record per-endpoint timings on `app` and serve them at `path`.
+
+    `tenant_getter` is called inside the request context and returns the
+    tenant (database name) the request is for, or None. Tenant names show
+    up in the output, so `path` needs METRICS_TOKEN as a bearer token, or
+    is limited to direct (unproxied) localhost requests when no token is
+    configured.
+    """
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+    metrics_endpoint = "metrics"
+
+    @app.before_request
+    def _start_timer():
+        if request.endpoint == metrics_endpoint:
+            return
+        g._metrics_start = time.perf_counter()
+        g._metrics_tracked = True
+        registry.in_flight.inc()
+
+    @app.after_request
+    def _record_request(response):
+        start = g.get("_metrics_start")
+        if start is None:
+            return response
+        labels = {
+            "method": request.method,
+            "endpoint": request.endpoint or "unmatched",
+            "tenant": registry.tenant_label(tenant_getter()),
+        }
+        registry.request_duration.observe(time.perf_counter() - start, **labels)
+        registry.requests.inc(status=response.status_code, **labels)
+        if not response.is_streamed:
+            registry.response_size.observe(response.calculate_content_length() or 0, **labels)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc):
+        if exc is not None:
+            registry.exceptions.inc(endpoint=request.endpoint or "unmatched", exception=type(exc).__name__)
+        if g.pop("_metrics_tracked", False):
+            registry.in_flight.dec()
+
+    @app.get(path, endpoint=metrics_endpoint)
+    def _metrics():
+        if METRICS_TOKEN:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {METRICS_TOKEN}".encode()):
+                return Response("Unauthorized\n", status=401, headers={"WWW-Authenticate": "Bearer"})
+        elif request.remote_addr not in _LOCAL_ADDRS or any(h in request.headers for h in _PROXY_HEADERS):
+            return Response("Forbidden\n", status=403)
+        return Response(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+    return registry
@@ -1,3 +1,4 @@
+import os
 import sys
 from pathlib import Path
 
@@ -12,6 +13,9 @@ import LLM.llm_functions
 
 from pathlib import Path
 
+# User whose notifications the mailbox pipeline publishes (the mailbox owner)
+PIPELINE_USER_ID = os.getenv("PIPELINE_NOTIFY_USER_ID")
+
 def latest_pdf(folder: str | Path, recursive: bool = False) -> str | None:
     folder = Path(folder)
     pattern = "**/*.[pP][dD][fF]" if recursive else "*.[pP][dD][fF]"
@@ -21,10 +25,13 @@ def latest_pdf(folder: str | Path, recursive: bool = False) -> str | None:
 
 
 
-def decide_file_type():
+def decide_file_type(user_id=PIPELINE_USER_ID):
     #read latest pddf fropm saved pdfs
     #decide which type of doc it is (what worfklow to run)
     #call it
+    if not user_id:
+        print("[WARN] PIPELINE_NOTIFY_USER_ID is not set; not processing the mailbox")
+        return
     print(1)
     file_path = latest_pdf("src/gmail_worker/downloads", False)
     print(f"Processing file: {file_path}")
@@ -33,29 +40,29 @@ def decide_file_type():
     print(text)
     if LLM.llm_functions.get_fields_to_fill_pdf(text,LLM.llm_functions.getFieldsFromTheDatabase()):
         #if there are fields 
-        fill_workflow(file_path)
+        fill_workflow(file_path, user_id)
     else:
         response = LLM.llm_functions.document_analyzer(file_path)
         if ("bill" in response):
-            transaction_workflow(file_path)
+            transaction_workflow(file_path, user_id)
         else:
-            compare_workflow(file_path)
+            compare_workflow(file_path, user_id)
 
     
 
-def compare_workflow(file_path):
+def compare_workflow(file_path, user_id):
     file_path2 = "test_files/rental_contract_pdf.pdf"
     print(f"Comparing {file_path} with {file_path2}")
     response1 = LLM.llm_functions.find_difference(file_path, file_path2)
-    create_compare_notification(response1)
+    create_compare_notification(response1, user_id=user_id)
 
-def fill_workflow(file_path):
+def fill_workflow(file_path, user_id):
     print("Filling form for file:", file_path)
     pdf = LLM.llm_functions.fill_in_form_pdf(file_path)
-    create_form_notification("Form filled successfully.")
+    create_form_notification("Form filled successfully.", user_id=user_id)
 
-def transaction_workflow(file_path):
+def transaction_workflow(file_path, user_id):
     print("Processing transaction for file:", file_path)
-    create_transaction_notification("Transaction is pending. Confirm to send.")
+    create_transaction_notification("Transaction is pending. Confirm to send.", user_id=user_id)
 
 
@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 """Test notification system integration"""
 import sys
+import time
 from pathlib import Path
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Notifications are delivered per user; this script subscribes as a test user
+TEST_USER_ID = "notification-test"
+
 print("=" * 60)
 print("NOTIFICATION SYSTEM TEST")
 print("=" * 60)
@@ -18,8 +22,7 @@ try:
         create_compare_notification,
         create_form_notification,
         create_transaction_notification,
-        create_generic_notification,
-        set_notification_queue
+        create_generic_notification
     )
     print("  [OK] All notification helper functions importable")
 except Exception as e:
@@ -44,15 +47,11 @@ except Exception as e:
 print("\n[3] Testing Frontend Notification System...")
 try:
     from src.FrontEnd import create_app
-    from src.FrontEnd.routes import notification_queue
+    from src.FrontEnd.notifications import broker
     
     app = create_app()
     print("  [OK] Frontend app created")
-    print("  [OK] Notification queue exists")
-    
-    # Test notification queue is initialized
-    if notification_queue:
-        print("  [OK] Notification queue is initialized")
+    print("  [OK] Notification broker exists")
 except Exception as e:
     print(f"  [FAIL] Frontend notification system failed: {e}")
     sys.exit(1)
@@ -60,25 +59,29 @@ except Exception as e:
 # Test 4: Notification helper integration
 print("\n[4] Testing Notification Helper Integration...")
 try:
-    from src.FrontEnd.notification_helper import set_notification_queue
-    from src.FrontEnd.routes import notification_queue
+    from src.FrontEnd.notifications import broker
+    subscription = broker.subscribe(TEST_USER_ID)
     
-    # Set the queue
-    set_notification_queue(notification_queue)
-    print("  [OK] Notification queue connected to helper")
+    print("  [OK] Broker subscription opened")
     
     # Test creating notifications
-    create_compare_notification("Test comparison result", "doc123")
+    create_compare_notification("Test comparison result", "doc123", user_id=TEST_USER_ID)
     print("  [OK] Compare notification created")
     
-    create_form_notification("Form filled successfully", "form456", "path/to/form.pdf")
+    create_form_notification("Form filled successfully", "form456", user_id=TEST_USER_ID)
     print("  [OK] Form notification created")
     
-    create_transaction_notification("Transaction pending", "trans789")
+    create_transaction_notification("Transaction pending", "trans789", user_id=TEST_USER_ID)
     print("  [OK] Transaction notification created")
     
-    # Check queue has notifications
-    queue_size = notification_queue.qsize()
+    # The default SQLite transport delivers from a background poller
+    deadline = time.time() + 5
+    while len(subscription.buffer) < 3 and time.time() < deadline:
+        time.sleep(0.1)
+    queue_size = len(subscription.buffer)
+    if queue_size == 0:
+        print("  [FAIL] No notifications were delivered to the subscription")
+        sys.exit(1)
     print(f"  [OK] Queue has {queue_size} notification(s)")
     
 except Exception as e:
@@ -7,6 +7,9 @@ import time
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Notifications are delivered per user; this script subscribes as a test user
+TEST_USER_ID = "notification-test"
+
 print("=" * 60)
 print("LIVE NOTIFICATION TEST")
 print("=" * 60)
@@ -19,8 +22,7 @@ try:
         create_compare_notification,
         create_form_notification,
         create_transaction_notification,
-        create_generic_notification,
-        set_notification_queue
+        create_generic_notification
     )
     print("  [OK] Notification helper imported")
 except Exception as e:
@@ -30,10 +32,10 @@ except Exception as e:
 # Test 2: Initialize notification queue
 print("\n[2] Initializing notification queue...")
 try:
-    from src.FrontEnd.routes import notification_queue
-    set_notification_queue(notification_queue)
+    from src.FrontEnd.notifications import broker
+    subscription = broker.subscribe(TEST_USER_ID)
     print("  [OK] Notification queue initialized")
-    print(f"  [INFO] Queue size: {notification_queue.qsize()}")
+    print(f"  [INFO] Queue size: {len(subscription.buffer)}")
 except Exception as e:
     print(f"  [FAIL] Queue initialization failed: {e}")
     sys.exit(1)
@@ -49,20 +51,21 @@ create_compare_notification(
     "- Updated rent amount from €800 to €850\n"
     "- New clause added about pet policy\n"
     "- Modified maintenance responsibility terms",
-    "doc123"
+    "doc123",
+    user_id=TEST_USER_ID
 )
 time.sleep(0.5)
-print(f"  [OK] Compare notification sent (queue size: {notification_queue.qsize()})")
+print(f"  [OK] Compare notification sent (queue size: {len(subscription.buffer)})")
 
 # Test Form Notification
 print("\n  [TEST] Sending form notification...")
 create_form_notification(
     "Form filled successfully. All fields have been completed using your database information.",
     "form456",
-    "filled_output.pdf"
+    user_id=TEST_USER_ID
 )
 time.sleep(0.5)
-print(f"  [OK] Form notification sent (queue size: {notification_queue.qsize()})")
+print(f"  [OK] Form notification sent (queue size: {len(subscription.buffer)})")
 
 # Test Transaction Notification
 print("\n  [TEST] Sending transaction notification...")
@@ -71,10 +74,11 @@ create_transaction_notification(
     "Amount: €1,250.00\n"
     "Date: 2025-11-09\n"
     "Status: Pending approval",
-    "trans789"
+    "trans789",
+    user_id=TEST_USER_ID
 )
 time.sleep(0.5)
-print(f"  [OK] Transaction notification sent (queue size: {notification_queue.qsize()})")
+print(f"  [OK] Transaction notification sent (queue size: {len(subscription.buffer)})")
 
 # Test Generic Notification
 print("\n  [TEST] Sending generic notification...")
@@ -82,16 +86,17 @@ create_generic_notification(
     "System Test",
     "This is a generic test notification to verify the notification system is working correctly.",
     "info",
-    {"test": True, "timestamp": time.time()}
+    {"test": True, "timestamp": time.time()},
+    user_id=TEST_USER_ID
 )
 time.sleep(0.5)
-print(f"  [OK] Generic notification sent (queue size: {notification_queue.qsize()})")
+print(f"  [OK] Generic notification sent (queue size: {len(subscription.buffer)})")
 
 # Summary
 print("\n" + "=" * 60)
 print("TEST SUMMARY")
 print("=" * 60)
-print(f"Total notifications in queue: {notification_queue.qsize()}")
+print(f"Total notifications in queue: {len(subscription.buffer)}")
 print()
 print("Next steps:")
 print("1. Start the frontend server:")
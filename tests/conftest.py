@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+# src.LLM reads the key at import time; the tests never call the API
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """An in-memory MongoDB client in place of the real one."""
+    mongomock = pytest.importorskip("mongomock")
+    import src.DataStorage.db as db
+
+    client = mongomock.MongoClient()
+    monkeypatch.setattr(db, "_client", client)
+    monkeypatch.setattr(db, "get_client", lambda: client)
+    return client
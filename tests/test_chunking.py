@@ -0,0 +1,131 @@
+import json
+import random
+import re
+import threading
+import time
+
+import pytest
+
+from src.LLM import chunking
+
+
+class WordEncoding:
+    """Stand-in for a tiktoken encoding: every word and every newline is a token."""
+
+    def encode(self, text, disallowed_special=()):
+        return re.findall(r"\S+|\n", text)
+
+
+@pytest.fixture(params=["estimate", "encoding"])
+def tokens(request, monkeypatch):
+    encoding = WordEncoding() if request.param == "encoding" else None
+    monkeypatch.setattr(chunking, "_get_encoding", lambda: encoding)
+
+
+def _document(rng, pages=30):
+    words = ["deadline", "invoice", "2026-01-31", "pay", "the", "amount", "of", "EUR", "100"]
+    sections = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 40))) for _ in range(rng.randint(1, 6))]
+        sections.append("\n".join(lines))
+    return "\n\n".join(sections)
+
+
+def _words(text):
+    return text.split()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_chunks_stay_within_budget_and_keep_every_word(tokens, seed):
+    text = _document(random.Random(seed))
+
+    chunks = chunking.split_text(text, max_tokens=200)
+
+    assert len(chunks) > 1
+    assert all(chunking.count_tokens(chunk) <= 200 for chunk in chunks)
+    assert [w for chunk in chunks for w in _words(chunk)] == _words(text)
+
+
+def test_separators_count_against_the_budget(monkeypatch):
+    monkeypatch.setattr(chunking, "_get_encoding", lambda: WordEncoding())
+    # Two 4-token blocks fit in 9 tokens, but not with the 2-token separator between them
+    text = "\n\n".join(["a b c d"] * 3)
+
+    assert chunking.split_text(text, max_tokens=9) == ["a b c d"] * 3
+    assert chunking.split_text(text, max_tokens=10) == ["a b c d\n\na b c d", "a b c d"]
+
+
+def test_short_text_is_one_chunk(tokens):
+    assert chunking.split_text("just a line", max_tokens=100) == ["just a line"]
+
+
+def test_overlong_lines_are_cut(tokens):
+    text = "x" * 5000
+    chunks = chunking.split_text(text, max_tokens=100)
+    assert "".join(chunks) == text
+    assert all(chunking.count_tokens(chunk) <= 100 for chunk in chunks)
+
+
+def test_map_chunks_keeps_chunk_order(monkeypatch):
+    monkeypatch.setattr(chunking, "MAP_WORKERS", 4)
+    seen_threads = set()
+
+    def slow_upper(chunk):
+        seen_threads.add(threading.current_thread().name)
+        time.sleep(0.01 * (5 - int(chunk[-1])))
+        return chunk.upper()
+
+    chunks = [f"chunk{n}" for n in range(5)]
+    assert chunking.map_chunks(slow_upper, chunks) == [c.upper() for c in chunks]
+    assert len(seen_threads) > 1
+
+
+def test_encoding_falls_back_to_an_estimate_when_unavailable(monkeypatch):
+    class BrokenTiktoken:
+        @staticmethod
+        def get_encoding(name):
+            raise OSError("offline")
+
+    monkeypatch.setattr(chunking, "tiktoken", BrokenTiktoken)
+    monkeypatch.setattr(chunking, "_encoding", None)
+    monkeypatch.setattr(chunking, "_encoding_loaded", False)
+
+    assert chunking.count_tokens("x" * 30) == 10
+    assert chunking._encoding_loaded
+
+
+def _reply(analysis):
+    return "```json\n" + json.dumps(analysis) + "\n```"
+
+
+def test_merge_analyses_combines_chunk_replies():
+    from src.LLM.llm_functions import _merge_analyses, parse_json_reply
+
+    replies = [
+        _reply({"category": "Tax", "name": "Tax letter", "date_received": None,
+                "deadlines": [["2026-03-01", "Pay", None]]}),
+        "no json here",
+        _reply({"category": "Lease", "name": "Lease", "date_received": "2026-01-05",
+                "deadlines": [{"date": "2026-02-01", "description": "Sign", "recurrence": None}]}),
+        _reply({"category": "Tax", "name": "Tax assessment", "date_received": "2026-01-09",
+                "deadlines": [["2026-03-01", " pay ", None], ["2026-04-01", "Object", None]]}),
+    ]
+
+    merged = parse_json_reply(_merge_analyses(replies))
+
+    assert merged == {
+        "category": "Tax",
+        "name": "Tax letter",
+        "date_received": "2026-01-05",
+        "deadlines": [
+            ["2026-02-01", "Sign", None],
+            ["2026-03-01", "Pay", None],
+            ["2026-04-01", "Object", None],
+        ],
+    }
+
+
+def test_merge_analyses_without_json_returns_the_first_reply():
+    from src.LLM.llm_functions import _merge_analyses
+
+    assert _merge_analyses(["first", "second"]) == "first"
@@ -0,0 +1,122 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from src.DataStorage.services import dashboard_service as dash
+from src.DataStorage.services import document_service as ds
+
+DB = "Dashboard_Test"
+START, END = date(2026, 1, 1), date(2026, 12, 31)
+
+
+@pytest.fixture(autouse=True)
+def fresh_db(mongo, monkeypatch):
+    monkeypatch.setattr(ds, "_indexed_dbs", set())
+    monkeypatch.setattr(dash, "_indexes", {})
+    return mongo[DB]
+
+
+def _expected(start=START, end=END):
+    """Deadlines computed from scratch, as (date, doc_id, description)."""
+    rows = []
+    for doc in ds.list_documents(db_name=DB):
+        for deadline_date, item in dash._deadline_items(doc):
+            if start <= deadline_date <= end:
+                rows.append((deadline_date, item["doc_id"], item["description"]))
+    return sorted(rows)
+
+
+def _indexed(index, start=START, end=END):
+    return sorted(
+        (datetime.strptime(i["deadline_date"][:10], "%Y-%m-%d").date(), i["doc_id"], i["description"])
+        for i in index.between(start, end)
+    )
+
+
+def _deadlines(rng):
+    deadlines = []
+    for n in range(rng.randint(0, 3)):
+        day = (START + timedelta(days=rng.randint(-30, 400))).isoformat()
+        if rng.random() < 0.5:
+            deadlines.append([day, f"d{n}"])
+        else:
+            deadlines.append({"date": day, "description": f"d{n}"})
+    if rng.random() < 0.1:
+        deadlines.append({"date": "not a date"})
+    return deadlines
+
+
+def test_parses_both_deadline_shapes_and_skips_bad_dates():
+    doc = {"_id": "x", "name": "Lease", "deadlines": [
+        ["2026-03-01", "pay"], {"date": "2026-04-01T00:00:00", "description": "renew"},
+        {"date": "soon"}, ["2026-05-01"], None,
+    ]}
+    items = dash._deadline_items(doc)
+    assert [(d, i["description"]) for d, i in items] == [
+        (date(2026, 3, 1), "pay"), (date(2026, 4, 1), "renew"),
+    ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_incremental_refresh_matches_a_full_rebuild(seed):
+    rng = random.Random(seed)
+    index = dash.DeadlineIndex(DB)
+    ids = []
+    for _ in range(60):
+        op = rng.random()
+        if op < 0.5 or not ids:
+            ids.append(ds.create_document({"name": "doc", "deadlines": _deadlines(rng)}, db_name=DB))
+        elif op < 0.8:
+            ds.update_document(rng.choice(ids), {"deadlines": _deadlines(rng)}, db_name=DB)
+        else:
+            doc_id = ids.pop(rng.randrange(len(ids)))
+            ds.delete_document(doc_id, db_name=DB)
+        if rng.random() < 0.3:
+            index.refresh()
+            assert _indexed(index) == _expected()
+    index.refresh()
+    assert _indexed(index) == _expected()
+    assert _indexed(index, date(2026, 3, 1), date(2026, 3, 31)) == _expected(date(2026, 3, 1), date(2026, 3, 31))
+
+
+def test_refresh_after_the_first_only_reads_changes(monkeypatch):
+    ds.create_document({"name": "a", "deadlines": [["2026-02-01", "x"]]}, db_name=DB)
+    index = dash.DeadlineIndex(DB)
+    index.refresh()
+
+    def no_full_scan(*args, **kwargs):
+        raise AssertionError("refresh listed every document")
+
+    monkeypatch.setattr(ds, "list_documents", no_full_scan)
+    ds.create_document({"name": "b", "deadlines": [["2026-02-02", "y"]]}, db_name=DB)
+    index.refresh()
+    assert [i["title"] for i in index.between(START, END)] == ["a", "b"]
+
+
+def test_stale_cursor_rebuilds_the_index(fresh_db):
+    a = ds.create_document({"name": "a", "deadlines": [["2026-02-01", "x"]]}, db_name=DB)
+    ds.create_document({"name": "b", "deadlines": [["2026-02-02", "y"]]}, db_name=DB)
+    index = dash.DeadlineIndex(DB)
+    index.refresh()
+
+    ds.delete_document(a, db_name=DB)
+    long_ago = (datetime.utcnow() - timedelta(days=ds.TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+    fresh_db["document_tombstones"].update_many({}, {"$set": {"deleted_at": long_ago}})
+    ds._prune_tombstones(DB)
+    assert fresh_db["document_tombstones"].count_documents({}) == 0
+
+    index.refresh()
+    assert [i["title"] for i in index.between(START, END)] == ["b"]
+
+
+def test_snapshot_buckets_the_calendar_by_day():
+    today = datetime.now().date()
+    soon = (today + timedelta(days=1)).isoformat()
+    ds.create_document({"name": "a", "deadlines": [[soon, "x"], [soon, "y"]]}, db_name=DB)
+
+    snapshot = dash.get_dashboard_snapshot(db_name=DB, calendar_start=today, calendar_end=today + timedelta(days=7))
+
+    assert [i["description"] for i in snapshot["approvals"]] == ["x", "y"]
+    assert [i["description"] for i in snapshot["calendar"]["days"][soon]] == ["x", "y"]
+    assert snapshot["cursor"] == 1
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from src.DataStorage.services import document_service as ds
+
+DB = "Feed_Test"
+
+
+@pytest.fixture(autouse=True)
+def fresh_db(mongo, monkeypatch):
+    monkeypatch.setattr(ds, "_indexed_dbs", set())
+    return mongo[DB]
+
+
+def _ids(docs):
+    return sorted(d["_id"] for d in docs)
+
+
+def test_first_call_is_a_full_snapshot():
+    a = ds.create_document({"name": "a"}, db_name=DB)
+    b = ds.create_document({"name": "b"}, db_name=DB)
+
+    feed = ds.list_document_changes(0, db_name=DB)
+
+    assert feed["full"] is True
+    assert _ids(feed["changed"]) == sorted([a, b])
+    assert feed["cursor"] == 2
+
+
+def test_delta_returns_only_later_writes_and_deletes():
+    a = ds.create_document({"name": "a"}, db_name=DB)
+    b = ds.create_document({"name": "b"}, db_name=DB)
+    cursor = ds.list_document_changes(0, db_name=DB)["cursor"]
+
+    assert ds.update_document(a, {"name": "a2"}, db_name=DB)
+    assert ds.delete_document(b, db_name=DB)
+    c = ds.create_document({"name": "c"}, db_name=DB)
+    feed = ds.list_document_changes(cursor, db_name=DB)
+
+    assert feed["full"] is False
+    assert _ids(feed["changed"]) == sorted([a, c])
+    assert feed["deleted"] == [b]
+    assert ds.list_document_changes(feed["cursor"], db_name=DB)["changed"] == []
+
+
+def test_cursor_stops_before_a_write_in_flight():
+    ds.create_document({"name": "a"}, db_name=DB)
+    cursor = ds.list_document_changes(0, db_name=DB)["cursor"]
+
+    with ds._sequenced_write(DB):
+        later = ds.create_document({"name": "b"}, db_name=DB)
+        feed = ds.list_document_changes(cursor, db_name=DB)
+        # The later write landed, but an earlier sequence number is still open
+        assert feed["cursor"] == cursor
+        assert feed["changed"] == []
+
+    feed = ds.list_document_changes(cursor, db_name=DB)
+    assert _ids(feed["changed"]) == [later]
+
+
+def test_no_op_update_is_not_modified_and_not_resent():
+    a = ds.create_document({"name": "a", "category": "x"}, db_name=DB)
+    cursor = ds.list_document_changes(0, db_name=DB)["cursor"]
+
+    assert ds.update_document(a, {"name": "a", "category": "x"}, db_name=DB) is False
+    assert ds.update_document(a, {}, db_name=DB) is False
+    assert ds.update_document("not-an-id", {"name": "b"}, db_name=DB) is False
+    assert ds.list_document_changes(cursor, db_name=DB)["changed"] == []
+
+
+def test_old_tombstones_are_pruned_and_stale_cursors_get_a_snapshot(fresh_db):
+    a = ds.create_document({"name": "a"}, db_name=DB)
+    b = ds.create_document({"name": "b"}, db_name=DB)
+    old_cursor = ds.list_document_changes(0, db_name=DB)["cursor"]
+    ds.delete_document(a, db_name=DB)
+    long_ago = (datetime.utcnow() - timedelta(days=ds.TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+    fresh_db["document_tombstones"].update_many({}, {"$set": {"deleted_at": long_ago}})
+
+    c = ds.create_document({"name": "c"}, db_name=DB)
+    ds.delete_document(c, db_name=DB)
+
+    remaining = [t["doc_id"] for t in fresh_db["document_tombstones"].find()]
+    assert remaining == [c]
+    feed = ds.list_document_changes(old_cursor, db_name=DB)
+    # The deletion of `a` is no longer on record, so the client must resync
+    assert feed["full"] is True
+    assert _ids(feed["changed"]) == [b]
@@ -0,0 +1,111 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.FrontEnd.notifications import InProcessTransport, NotificationBroker, NotificationLog, Subscription
+from src.FrontEnd.notifications import log as log_module
+
+
+@pytest.fixture
+def log(tmp_path):
+    return NotificationLog(tmp_path / "notifications.db", retention_days=1, max_per_user=3)
+
+
+def _ids(items):
+    return [item["id"] for item in items]
+
+
+def test_since_returns_the_users_and_broadcast_entries_in_order(log):
+    log.append({"n": 1}, "u1")
+    log.append({"n": 2}, "u2")
+    log.append({"n": 3})
+    log.append({"n": 4}, "u1")
+
+    assert [e["n"] for e in log.since(0, "u1")] == [1, 3, 4]
+    assert [e["n"] for e in log.since(1, "u1")] == [3, 4]
+    assert [e["n"] for e in log.since(0, "u1", limit=2)] == [3, 4]
+    assert [e["n"] for e in log.since(0)] == [3]
+
+
+def test_compaction_keeps_the_newest_entries_per_user(log):
+    for n in range(5):
+        log.append({"n": n}, "u1")
+    for n in range(2):
+        log.append({"n": n}, "u2")
+    for n in range(4):
+        log.append({"n": n})
+
+    assert log.compact() == 3
+
+    kept = {}
+    for user_id, notification in log.tail(0):
+        kept.setdefault(user_id, []).append(notification["n"])
+    assert kept == {"u1": [2, 3, 4], "u2": [0, 1], None: [1, 2, 3]}
+
+
+def test_compaction_drops_expired_entries(log):
+    old = log.append({"n": 1}, "u1")
+    log.append({"n": 2}, "u1")
+    conn = sqlite3.connect(log.path)
+    with conn:
+        conn.execute("UPDATE notifications SET created_at = ? WHERE id = ?", (time.time() - 2 * 86400, old))
+    conn.close()
+
+    assert log.compact() == 1
+    assert [e["n"] for e in log.since(0, "u1")] == [2]
+
+
+def test_appends_compact_periodically(log, monkeypatch):
+    monkeypatch.setattr(log_module, "COMPACT_EVERY", 4)
+    for n in range(8):
+        log.append({"n": n}, "u1")
+
+    # Compacted after the 4th and 8th append
+    assert [e["n"] for e in log.since(0, "u1", limit=10)] == [5, 6, 7]
+
+
+def test_replayed_and_live_copies_are_sent_once():
+    subscription = Subscription("u1")
+    subscription._put({"id": 5, "n": "live"})
+    subscription._replay([{"id": 4, "n": "logged"}, {"id": 5, "n": "logged"}])
+
+    assert _ids(subscription.get(timeout=0)) == [4, 5]
+
+    subscription._replay([{"id": 5}, {"id": 6}])
+    assert _ids(subscription.get(timeout=0)) == [6]
+
+
+def test_out_of_order_ids_are_still_delivered():
+    subscription = Subscription("u1")
+    subscription._put({"id": 7})
+    assert _ids(subscription.get(timeout=0)) == [7]
+
+    # A concurrent publisher's earlier id arrives late
+    subscription._put({"id": 6})
+    subscription._put({"id": 7})
+    assert _ids(subscription.get(timeout=0)) == [6]
+
+
+def test_remembered_ids_are_bounded():
+    subscription = Subscription("u1", buffer_size=2)
+    for event_id in range(1, 21):
+        subscription._put({"id": event_id})
+        subscription.get(timeout=0)
+
+    assert len(subscription._sent_ids) == subscription._sent_limit == 8
+    subscription._put({"id": 1})
+    assert _ids(subscription.get(timeout=0)) == [1]
+
+
+def test_reconnecting_client_replays_from_last_event_id(log):
+    broker = NotificationBroker(buffer_size=10, log=log, transport=InProcessTransport(log))
+    first = broker.subscribe("u1")
+    ids = [broker.publish({"n": n}, user_id="u1") for n in range(3)]
+    assert _ids(first.get(timeout=0)) == ids
+    broker.unsubscribe(first)
+
+    broker.publish({"n": 3}, user_id="u1")
+    again = broker.subscribe("u1", last_event_id=ids[0])
+
+    assert [item["n"] for item in again.get(timeout=0)] == [1, 2, 3]
@@ -0,0 +1,61 @@
+from src.FrontEnd.notifications import InProcessTransport, NotificationBroker, Subscription
+
+
+def _broker(buffer_size=3):
+    return NotificationBroker(buffer_size=buffer_size, transport=InProcessTransport())
+
+
+def test_full_buffer_drops_the_oldest():
+    broker = _broker(buffer_size=3)
+    subscription = broker.subscribe("u1")
+
+    for n in range(5):
+        broker.publish({"n": n}, user_id="u1")
+
+    assert [item["n"] for item in subscription.get(timeout=0)] == [2, 3, 4]
+    assert subscription.dropped == 2
+    assert broker.dropped.render().endswith("notifications_dropped_total 2")
+    assert broker.published.render().endswith("notifications_published_total 5")
+
+
+def test_slow_subscriber_does_not_hold_back_others():
+    broker = _broker(buffer_size=2)
+    slow = broker.subscribe("u1")
+    fast = broker.subscribe("u1")
+
+    for n in range(4):
+        broker.publish({"n": n}, user_id="u1")
+        assert [item["n"] for item in fast.get(timeout=0)] == [n]
+
+    assert [item["n"] for item in slow.get(timeout=0)] == [2, 3]
+    assert fast.dropped == 0
+
+
+def test_notifications_reach_only_their_user_and_broadcasts_reach_all():
+    broker = _broker()
+    u1, u2 = broker.subscribe("u1"), broker.subscribe("u2")
+
+    broker.publish({"to": "u1"}, user_id="u1")
+    broker.publish({"to": "all"})
+
+    assert [item["to"] for item in u1.get(timeout=0)] == ["u1", "all"]
+    assert [item["to"] for item in u2.get(timeout=0)] == ["all"]
+
+
+def test_unsubscribed_clients_get_nothing():
+    broker = _broker()
+    subscription = broker.subscribe("u1")
+    broker.unsubscribe(subscription)
+
+    broker.publish({"n": 1}, user_id="u1")
+
+    assert subscription.closed
+    assert subscription.get(timeout=0) == []
+    assert broker.stats() == {"subscribers": 0, "users": 0, "backlog": 0}
+
+
+def test_get_waits_for_a_notification():
+    subscription = Subscription("u1")
+    assert subscription.get(timeout=0.01) == []
+    subscription._put({"n": 1})
+    assert subscription.get(timeout=0.01) == [{"n": 1}]
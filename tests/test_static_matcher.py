@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from src.FrontEnd.static_matcher import StaticItemMatcher, get_matcher
+
+
+def naive_match(titles, doc_title, doc_name):
+    """The scan get_category_items did before the matcher."""
+    static_map = {title: title for title in titles}
+    if doc_title in static_map:
+        return static_map[doc_title]
+    if doc_name in static_map:
+        return static_map[doc_name]
+    for static_title in static_map:
+        if static_title in doc_title or doc_title in static_title:
+            return static_title
+        if static_title in doc_name or doc_name in static_title:
+            return static_title
+    return None
+
+
+def _word(rng, alphabet="abc", max_len=5):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_len)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_the_naive_scan(seed):
+    rng = random.Random(seed)
+    for _ in range(50):
+        titles = [_word(rng, max_len=6) for _ in range(rng.randint(0, 8))]
+        matcher = StaticItemMatcher(titles)
+        for _ in range(40):
+            doc_title, doc_name = _word(rng, max_len=8), _word(rng, max_len=8)
+            assert matcher.match(doc_title, doc_name) == naive_match(titles, doc_title, doc_name), \
+                (titles, doc_title, doc_name)
+
+
+def test_realistic_titles():
+    titles = ["Lease Agreement", "Tax Return", "Insurance", "Lease"]
+    matcher = StaticItemMatcher(titles)
+    cases = [
+        ("Lease", "scan.pdf"),
+        ("Signed Lease Agreement 2026", ""),
+        ("Car Insurance policy", "ins.pdf"),
+        ("Tax", "return.pdf"),
+        ("Unrelated", "unrelated.pdf"),
+        ("", "Tax Return"),
+    ]
+    for doc_title, doc_name in cases:
+        assert matcher.match(doc_title, doc_name) == naive_match(titles, doc_title, doc_name)
+
+
+def test_matcher_is_built_once_per_title_list():
+    assert get_matcher(["a", "b"]) is get_matcher(("a", "b"))
+    assert get_matcher(["a", "b"]) is not get_matcher(["b", "a"])
@@ -0,0 +1,133 @@
+import hashlib
+import io
+import threading
+from pathlib import Path
+
+import pytest
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+from src.BackEnd.app import uploads as up
+
+BOUNDARY = "testboundary"
+
+
+def _body(content: bytes, filename="report.pdf", fields=None, closed=True) -> bytes:
+    parts = []
+    for name, value in (fields or {}).items():
+        parts.append(
+            f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"{name}\"\r\n\r\n{value}\r\n".encode()
+        )
+    parts.append(
+        f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n".encode() + content + b"\r\n"
+    )
+    if closed:
+        parts.append(f"--{BOUNDARY}--\r\n".encode())
+    return b"".join(parts)
+
+
+@pytest.fixture(autouse=True)
+def upload_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(up, "UPLOAD_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def jobs(mongo, monkeypatch):
+    """The jobs collection, with analyses recorded instead of run."""
+    monkeypatch.setattr(up, "_indexes_ready", False)
+    submitted = []
+    monkeypatch.setattr(up._executor, "submit", lambda fn, *args: submitted.append(args))
+    return submitted
+
+
+def _saved(content: bytes, **kwargs):
+    return up.save_multipart_stream(io.BytesIO(_body(content, **kwargs)), BOUNDARY)
+
+
+def test_file_is_streamed_to_disk_in_chunks(upload_dir, monkeypatch):
+    monkeypatch.setattr(up, "CHUNK_SIZE", 1024)
+    content = bytes(range(256)) * 200
+
+    upload = _saved(content, fields={"db_name": "Some_Tenant"})
+
+    assert upload["size_bytes"] == len(content)
+    assert upload["sha256"] == hashlib.sha256(content).hexdigest()
+    assert upload["filename"] == "report.pdf"
+    assert upload["fields"] == {"db_name": "Some_Tenant"}
+    with open(upload["path"], "rb") as f:
+        assert f.read() == content
+    assert not list(upload_dir.glob(".*.part"))
+
+
+def test_unsafe_filename_is_sanitized():
+    upload = _saved(b"x", filename="../../etc/passwd")
+    assert upload["filename"] == "etc_passwd"
+
+
+@pytest.mark.parametrize("body", [
+    _body(b"x" * 5000, closed=False),
+    _body(b"x" * 5000)[:-300],
+    b"not a multipart body",
+])
+def test_truncated_or_malformed_body_is_rejected(body, upload_dir):
+    with pytest.raises(BadRequest):
+        up.save_multipart_stream(io.BytesIO(body), BOUNDARY)
+    assert not list(upload_dir.iterdir())
+
+
+def test_missing_file_part_is_rejected():
+    body = f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"a\"\r\n\r\n1\r\n--{BOUNDARY}--\r\n"
+    with pytest.raises(BadRequest):
+        up.save_multipart_stream(io.BytesIO(body.encode()), BOUNDARY)
+
+
+def test_oversized_file_is_rejected(upload_dir, monkeypatch):
+    monkeypatch.setattr(up, "MAX_UPLOAD_BYTES", 100)
+    with pytest.raises(RequestEntityTooLarge):
+        _saved(b"x" * 101)
+    assert not list(upload_dir.iterdir())
+
+
+def test_identical_upload_reuses_the_job(jobs):
+    first = up.enqueue_analysis(_saved(b"same"), db_name="T")
+    second_upload = _saved(b"same")
+    second = up.enqueue_analysis(second_upload, db_name="T")
+
+    assert second["job_id"] == first["job_id"]
+    assert second["duplicate"] is True
+    assert len(jobs) == 1
+    assert not Path(second_upload["path"]).exists()
+    assert "file" not in first and "file" not in second
+    # Another tenant's identical file is analyzed on its own
+    assert "duplicate" not in up.enqueue_analysis(_saved(b"same"), db_name="Other")
+
+
+def test_failed_job_does_not_block_a_retry(jobs):
+    first = up.enqueue_analysis(_saved(b"same"), db_name="T")
+    up._update_job(first["job_id"], status="failed", error="boom")
+
+    retry = up.enqueue_analysis(_saved(b"same"), db_name="T")
+
+    assert retry["job_id"] != first["job_id"]
+    assert "duplicate" not in retry
+
+
+def test_concurrent_identical_uploads_are_analyzed_once(jobs):
+    uploads = [_saved(b"same") for _ in range(8)]
+    barrier = threading.Barrier(len(uploads))
+    results = []
+
+    def enqueue(upload):
+        barrier.wait()
+        results.append(up.enqueue_analysis(upload, db_name="T"))
+
+    threads = [threading.Thread(target=enqueue, args=(u,)) for u in uploads]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(jobs) == 1
+    assert len({r["job_id"] for r in results}) == 1
+    assert up.get_job(results[0]["job_id"])["status"] == "queued"
@@ -0,0 +1,107 @@
+import os
+import sqlite3
+
+import pytest
+
+from src.FrontEnd.data_storage import visit_tracker as vt
+
+
+@pytest.fixture(autouse=True)
+def visits_db(tmp_path, monkeypatch):
+    path = tmp_path / "visits.db"
+    monkeypatch.setattr(vt, "VISITS_DB", path)
+    monkeypatch.setattr(vt, "_visits", {})
+    monkeypatch.setattr(vt, "_pending", {})
+    monkeypatch.setattr(vt, "_flushing", {})
+    # Flush explicitly instead of from the background thread
+    monkeypatch.setattr(vt, "_flusher_pid", os.getpid())
+    return path
+
+
+def _stored(path):
+    conn = sqlite3.connect(path)
+    try:
+        return dict(conn.execute("SELECT user_id || ':' || endpoint, count FROM visits").fetchall())
+    finally:
+        conn.close()
+
+
+def _restart_worker(monkeypatch):
+    """Forget in-memory state, as a freshly started worker would."""
+    monkeypatch.setattr(vt, "_visits", {})
+    monkeypatch.setattr(vt, "_pending", {})
+
+
+def _counts(user_id):
+    return {v["endpoint"]: v["count"] for v in vt.get_top_visits(limit=10, user_id=user_id)}
+
+
+def test_visits_are_buffered_then_flushed_in_one_row(visits_db):
+    for _ in range(3):
+        vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.track_visit("frontend.home", "Home", "house", user_id="u1")
+
+    assert _counts("u1") == {"frontend.taxes": 3, "frontend.home": 1}
+    assert not visits_db.exists() or _stored(visits_db) == {}
+
+    vt.flush()
+
+    assert _stored(visits_db) == {"u1:frontend.taxes": 3, "u1:frontend.home": 1}
+    assert _counts("u1") == {"frontend.taxes": 3, "frontend.home": 1}
+
+
+def test_flushes_add_to_stored_counts(visits_db, monkeypatch):
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.flush()
+    _restart_worker(monkeypatch)
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u2")
+    vt.flush()
+
+    assert _stored(visits_db) == {"u1:frontend.taxes": 2, "u2:frontend.taxes": 1}
+    assert _counts("u1") == {"frontend.taxes": 2}
+
+
+def test_loaded_users_pick_up_other_workers_visits(monkeypatch):
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.flush()
+    assert _counts("u1") == {"frontend.taxes": 1}
+    this_worker = (vt._visits, vt._pending)
+
+    _restart_worker(monkeypatch)
+    for _ in range(4):
+        vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.flush()
+
+    monkeypatch.setattr(vt, "_visits", this_worker[0])
+    monkeypatch.setattr(vt, "_pending", this_worker[1])
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    assert _counts("u1") == {"frontend.taxes": 2}
+    vt.flush()
+    assert _counts("u1") == {"frontend.taxes": 6}
+
+
+def test_reads_before_a_flush_see_stored_and_buffered_visits(visits_db, monkeypatch):
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    vt.flush()
+    _restart_worker(monkeypatch)
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+
+    assert _counts("u1") == {"frontend.taxes": 2}
+
+
+def test_failed_flush_keeps_the_counts(visits_db, monkeypatch):
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+
+    def broken():
+        raise sqlite3.OperationalError("database is locked")
+
+    real_connect = vt._connect
+    monkeypatch.setattr(vt, "_connect", broken)
+    vt.flush()
+    vt.track_visit("frontend.taxes", "Taxes", "cash", user_id="u1")
+    monkeypatch.setattr(vt, "_connect", real_connect)
+    vt.flush()
+
+    assert _stored(visits_db) == {"u1:frontend.taxes": 2}
+    assert vt._pending == {}
@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 """Verify notification system is working correctly"""
 import sys
+import time
 from pathlib import Path
 
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+# Notifications are delivered per user; this script subscribes as a test user
+TEST_USER_ID = "notification-test"
+
 print("=" * 60)
 print("NOTIFICATION SYSTEM VERIFICATION")
 print("=" * 60)
@@ -18,10 +22,10 @@ try:
         create_compare_notification,
         create_form_notification,
         create_transaction_notification,
-        create_generic_notification,
-        set_notification_queue
+        create_generic_notification
     )
-    from src.FrontEnd.routes import notification_queue
+    from src.FrontEnd.notifications import broker
+    subscription = broker.subscribe(TEST_USER_ID)
     print("  [OK] All imports successful")
 except Exception as e:
     print(f"  [FAIL] Import failed: {e}")
@@ -30,9 +34,8 @@ except Exception as e:
 # Test 2: Initialize queue
 print("\n[2] Testing queue initialization...")
 try:
-    set_notification_queue(notification_queue)
     print("  [OK] Queue initialized")
-    print(f"  [INFO] Initial queue size: {notification_queue.qsize()}")
+    print(f"  [INFO] Initial queue size: {len(subscription.buffer)}")
 except Exception as e:
     print(f"  [FAIL] Queue initialization failed: {e}")
     sys.exit(1)
@@ -43,7 +46,7 @@ test_notifications = []
 
 # Test Compare
 try:
-    create_compare_notification("Test comparison result", "doc123")
+    create_compare_notification("Test comparison result", "doc123", user_id=TEST_USER_ID)
     test_notifications.append(("compare", "doc123"))
     print("  [OK] Compare notification created")
 except Exception as e:
@@ -51,7 +54,7 @@ except Exception as e:
 
 # Test Form
 try:
-    create_form_notification("Form filled successfully", "form456", "test.pdf")
+    create_form_notification("Form filled successfully", "form456", user_id=TEST_USER_ID)
     test_notifications.append(("form", "form456"))
     print("  [OK] Form notification created")
 except Exception as e:
@@ -59,7 +62,7 @@ except Exception as e:
 
 # Test Transaction
 try:
-    create_transaction_notification("Transaction pending", "trans789")
+    create_transaction_notification("Transaction pending", "trans789", user_id=TEST_USER_ID)
     test_notifications.append(("transaction", "trans789"))
     print("  [OK] Transaction notification created")
 except Exception as e:
@@ -67,7 +70,7 @@ except Exception as e:
 
 # Test Generic
 try:
-    create_generic_notification("Test", "Generic notification", "info", {"test": True})
+    create_generic_notification("Test", "Generic notification", "info", {"test": True}, user_id=TEST_USER_ID)
     test_notifications.append(("info", None))
     print("  [OK] Generic notification created")
 except Exception as e:
@@ -75,7 +78,9 @@ except Exception as e:
 
 # Test 4: Verify queue contents
 print("\n[4] Verifying queue contents...")
-queue_size = notification_queue.qsize()
+# The default SQLite transport delivers from a background poller
+time.sleep(1)
+queue_size = len(subscription.buffer)
 print(f"  [INFO] Queue size: {queue_size}")
 print(f"  [INFO] Expected notifications: {len(test_notifications)}")
 
@@ -89,15 +94,13 @@ print("\n[5] Testing notification retrieval...")
 try:
     # Get one notification to verify structure
     if queue_size > 0:
-        notification = notification_queue.get()
+        notification = subscription.buffer[0]
         print(f"  [OK] Notification retrieved from queue")
         print(f"  [INFO] Notification type: {notification.get('type', 'unknown')}")
         print(f"  [INFO] Notification title: {notification.get('title', 'N/A')}")
         print(f"  [INFO] Has message: {'message' in notification}")
         print(f"  [INFO] Has data: {'data' in notification}")
-        
-        # Put it back for testing
-        notification_queue.put(notification)
+
         print("  [OK] Notification structure is correct")
     else:
         print("  [WARN] No notifications in queue to test")
@@ -123,7 +126,7 @@ print("\n" + "=" * 60)
 print("VERIFICATION SUMMARY")
 print("=" * 60)
 print(f"Notifications created: {len(test_notifications)}")
-print(f"Queue size: {notification_queue.qsize()}")
+print(f"Queue size: {len(subscription.buffer)}")
 print()
 print("Status: [SUCCESS] Notification system is working correctly!")
 print()